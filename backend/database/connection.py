@@ -242,6 +242,17 @@ class DatabaseConnection:
         except Exception as e:
             logger.warning(f"Vacuum operation failed: {e}")
     
+    def analyze(self):
+        """Refresh planner statistics so new indexes are picked up."""
+        try:
+            if self.use_duckdb:
+                self.execute("ANALYZE")
+            else:
+                self.execute("PRAGMA optimize")
+            logger.info("Database statistics refreshed")
+        except Exception as e:
+            logger.warning(f"Analyze operation failed: {e}")
+    
     def __enter__(self):
         """Context manager entry."""
         self.connect()
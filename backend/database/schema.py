@@ -131,7 +131,8 @@ def create_games_table(db_conn: DatabaseConnection):
         "CREATE INDEX IF NOT EXISTS idx_games_home_team ON games(home_team_id)",
         "CREATE INDEX IF NOT EXISTS idx_games_away_team ON games(away_team_id)",
         "CREATE INDEX IF NOT EXISTS idx_games_status ON games(game_status)",
-        "CREATE INDEX IF NOT EXISTS idx_games_date_status ON games(date, game_status)"
+        "CREATE INDEX IF NOT EXISTS idx_games_date_status ON games(date, game_status)",
+        "CREATE INDEX IF NOT EXISTS idx_games_season_status ON games(season, game_status)"
     ]
     
     for idx in indexes:
@@ -56,14 +56,43 @@ class GamesRepository:
         
         return self.db.fetch_all(query)
     
-    def get_completed_games_df(self) -> pd.DataFrame:
-        """Get all completed games as DataFrame (replaces CSV read)."""
+    def get_completed_games_df(
+        self,
+        season: Optional[str] = None,
+        limit: Optional[int] = None,
+        last: bool = False
+    ) -> pd.DataFrame:
+        """
+        Get completed games as DataFrame (replaces CSV read).
+        
+        Args:
+            season: Only return games from this season
+            limit: Maximum number of games to return
+            last: With limit, return the most recent games rather than the earliest
+        
+        Returns:
+            DataFrame of completed games in date order
+        """
         query = """
             SELECT * FROM games 
             WHERE game_status = 'Final'
-            ORDER BY date
         """
-        return self.db.fetch_df(query)
+        params = []
+        
+        if season:
+            query += " AND season = ?"
+            params.append(season)
+        
+        query += " ORDER BY date DESC" if last else " ORDER BY date"
+        
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        if last:
+            query = f"SELECT * FROM ({query}) ORDER BY date"
+        
+        return self.db.fetch_df(query, tuple(params) if params else None)
     
     def get_upcoming_games(self, days_ahead: int = 7) -> List[Dict]:
         """Get upcoming scheduled games."""
@@ -4,9 +4,11 @@ Betting Tracker for NCAA Basketball Predictions
 Tracks hypothetical $1 bets on teams with highest win probability that have moneylines.
 """
 
+import numpy as np
 import pandas as pd
 import os
 from datetime import datetime, date
+from functools import lru_cache
 import unicodedata
 
 
@@ -46,6 +48,7 @@ def derive_season_label(date_str: str):
     return f"{start_year}-{str(start_year + 1)[-2:]}"
 
 
+@lru_cache(maxsize=1024)
 def american_odds_to_payout(odds, bet_amount=1.0):
     """
     Convert American odds to payout for a winning bet.
@@ -75,6 +78,7 @@ def american_odds_to_payout(odds, bet_amount=1.0):
     return bet_amount + profit
 
 
+@lru_cache(maxsize=1024)
 def is_bettable_moneyline(moneyline):
     """
     Check if a moneyline represents a bettable game.
@@ -95,13 +99,27 @@ def is_bettable_moneyline(moneyline):
         return False
     
     # Moneylines more extreme than -1000 are considered unbettable
-    # (e.g., -3000, -100000 are too extreme to be practical bets)
-    if moneyline < -1000:
+    # (e.g., -3000, -100000 are too extreme to be practical bets);
+    # a 0 line is not a valid American price
+    if moneyline < -1000 or moneyline == 0:
         return False
     
     return True
 
 
+def _profit_per_dollar(ml):
+    """
+    Profit per $1 won at American odds, as a float array.
+    
+    Odds are truncated to integers like is_bettable_moneyline; missing, extreme
+    (< -1000) and 0 lines are unbettable and come back as NaN.
+    """
+    ml = np.trunc(np.asarray(ml, dtype=float))
+    bettable = ~np.isnan(ml) & (ml >= -1000) & (ml != 0)
+    odds = np.where(bettable, ml, 100.0)
+    return np.where(bettable, np.where(odds > 0, odds / 100.0, 100.0 / np.abs(odds)), np.nan)
+
+
 def calculate_value_score(confidence, moneyline):
     """
     Calculate a value score for a bet combining confidence and moneyline value.
@@ -127,10 +145,7 @@ def calculate_value_score(confidence, moneyline):
         return None
     
     # Calculate potential profit per dollar bet
-    if moneyline > 0:
-        potential_profit = moneyline / 100.0
-    else:
-        potential_profit = 100.0 / abs(moneyline)
+    potential_profit = float(_profit_per_dollar(moneyline))
     
     # Value score = expected value = (confidence * potential_profit) - ((1 - confidence) * 1)
     # This represents the expected profit per dollar wagered
@@ -139,10 +154,26 @@ def calculate_value_score(confidence, moneyline):
     return value_score
 
 
+def map_scoreboard_team(raw, pred_home, pred_away):
+    """Map a scoreboard team name back to the prediction log's home/away naming."""
+    if not isinstance(raw, str):
+        return raw
+    raw_can = canonicalize_team_name(raw)
+    home_can = canonicalize_team_name(pred_home)
+    away_can = canonicalize_team_name(pred_away)
+    if home_can and home_can in raw_can:
+        return pred_home
+    if away_can and away_can in raw_can:
+        return pred_away
+    return raw
+
+
 def calculate_bet_result(row, bet_amount=1.0):
     """
     Calculate result of a $1 bet on the predicted winner with a moneyline.
     
+    Thin single-row wrapper around calculate_bet_results_vec.
+    
     Args:
         row: DataFrame row with prediction and game result
         bet_amount: Amount bet per game (default $1.00)
@@ -150,114 +181,110 @@ def calculate_bet_result(row, bet_amount=1.0):
     Returns:
         dict with bet details and result
     """
-    result = {
-        'game_id': row.get('game_id'),
-        'date': row.get('date'),
-        'away_team': row.get('away_team'),
-        'home_team': row.get('home_team'),
-        'predicted_winner': row.get('predicted_winner'),
-        'confidence': row.get('confidence'),
-        'bet_amount': bet_amount,
-        'moneyline': None,
-        'actual_winner': None,
-        'bet_won': None,
-        'payout': 0.0,
-        'profit': -bet_amount,
-        'has_moneyline': False
-    }
-    
-    # Determine who we're betting on (team with highest win probability)
-    predicted_home_win = row.get('predicted_home_win', 0)
-    # Original predicted home/away labels
-    home_team = row.get('home_team', '')
-    away_team = row.get('away_team', '')
-    scoreboard_home = row.get('home_team_completed')
-    scoreboard_away = row.get('away_team_completed')
-    
-    # Get moneylines
-    home_moneyline = row.get('home_moneyline')
-    away_moneyline = row.get('away_moneyline')
-    
-    # Determine which team we bet on and their moneyline
-    if predicted_home_win == 1:
-        bet_team = home_team
-        moneyline = home_moneyline
-    else:
-        bet_team = away_team
-        moneyline = away_moneyline
-    
-    # Check if moneyline is available and bettable
-    if moneyline is None or pd.isna(moneyline) or moneyline == '' or not is_bettable_moneyline(moneyline):
-        # No moneyline available or unbettable (e.g., -100000), skip this bet
-        return result
-    
-    result['has_moneyline'] = True
-    result['moneyline'] = moneyline
+    return calculate_bet_results_vec(pd.DataFrame([row]), bet_amount).iloc[0].to_dict()
+
+
+def predicted_moneyline(df):
+    """
+    Moneyline for each row's predicted winner as a float Series.
     
-    # Determine actual winner
-    home_score = row.get('home_score')
-    away_score = row.get('away_score')
+    Missing or non-numeric moneylines come back as NaN.
+    """
+    nan = pd.Series(np.nan, index=df.index)
+    home_ml = pd.to_numeric(df['home_moneyline'], errors='coerce') if 'home_moneyline' in df.columns else nan
+    away_ml = pd.to_numeric(df['away_moneyline'], errors='coerce') if 'away_moneyline' in df.columns else nan
+    return pd.Series(np.where(predicted_home_mask(df), home_ml, away_ml), index=df.index, dtype=float)
+
+
+def predicted_home_mask(df):
+    """Boolean array that is True where the home team is the predicted winner."""
+    if 'predicted_home_win' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return (df['predicted_home_win'] == 1).to_numpy()
+
+
+def calculate_bet_results_vec(df, bet_amount=1.0):
+    """
+    Calculate $1-bet results on the predicted winner for a whole predictions DataFrame.
     
-    if home_score is None or away_score is None or pd.isna(home_score) or pd.isna(away_score):
-        # Game not completed yet
-        return result
+    Args:
+        df: DataFrame of predictions joined with game results
+        bet_amount: Amount bet per game (default $1.00)
     
-    # Handle potential home/away label mismatches between prediction log and completed games.
-    # Previous logic flipped scores, which inverted many heavy favorite wins into losses.
-    if (
-        scoreboard_home is not None and pd.notna(scoreboard_home) and
-        canonicalize_team_name(scoreboard_home) != canonicalize_team_name(home_team)
-    ):
-        # Use the scoreboard team names to determine winner, then map back to predicted naming
-        if home_score > away_score:
-            raw_winner = scoreboard_home
-        elif away_score > home_score:
-            raw_winner = scoreboard_away
+    Returns:
+        DataFrame with one row per input row: bet details, actual winner,
+        bet_won (True/False, None for ties or incomplete games), payout and profit
+    """
+    n = len(df)
+    
+    def col(name, default=None):
+        if name in df.columns:
+            return df[name].to_numpy(dtype=object)
+        return np.full(n, default, dtype=object)
+    
+    home_team = col('home_team', '')
+    away_team = col('away_team', '')
+    pick_home = predicted_home_mask(df)
+    bet_team = np.where(pick_home, home_team, away_team)
+    
+    # Moneyline on the predicted winner; unusable or extreme lines mean no bet
+    profit_per_dollar = _profit_per_dollar(predicted_moneyline(df))
+    has_moneyline = ~np.isnan(profit_per_dollar)
+    raw_moneyline = np.where(pick_home, col('home_moneyline'), col('away_moneyline'))
+    
+    home_score = pd.to_numeric(df['home_score'], errors='coerce').to_numpy(dtype=float) if 'home_score' in df.columns else np.full(n, np.nan)
+    away_score = pd.to_numeric(df['away_score'], errors='coerce').to_numpy(dtype=float) if 'away_score' in df.columns else np.full(n, np.nan)
+    completed = has_moneyline & ~np.isnan(home_score) & ~np.isnan(away_score)
+    home_won = home_score > away_score
+    away_won = away_score > home_score
+    
+    # Winner in prediction-log naming when the scoreboard labels line up
+    actual_winner = np.where(home_won, home_team, np.where(away_won, away_team, 'TIE')).astype(object)
+    
+    # Rows whose scoreboard home team differs from the predicted one resolve
+    # the winner from scoreboard names, then map back to prediction-log naming
+    scoreboard_home = col('home_team_completed')
+    scoreboard_away = col('away_team_completed')
+    for i in np.flatnonzero(completed & pd.notna(scoreboard_home)):
+        if canonicalize_team_name(scoreboard_home[i]) == canonicalize_team_name(home_team[i]):
+            continue
+        if home_won[i]:
+            raw_winner = scoreboard_home[i]
+        elif away_won[i]:
+            raw_winner = scoreboard_away[i]
         else:
             raw_winner = 'TIE'
-
-        def map_team(raw, pred_home, pred_away):
-            if not isinstance(raw, str):
-                return raw
-            raw_can = canonicalize_team_name(raw)
-            home_can = canonicalize_team_name(pred_home)
-            away_can = canonicalize_team_name(pred_away)
-            if home_can and home_can in raw_can:
-                return pred_home
-            if away_can and away_can in raw_can:
-                return pred_away
-            return raw
-
-        mapped_winner = map_team(raw_winner, home_team, away_team)
-        actual_winner = mapped_winner
-    else:
-        # Normal case: names already aligned
-        if home_score > away_score:
-            actual_winner = home_team
-        elif away_score > home_score:
-            actual_winner = away_team
-        else:
-            actual_winner = 'TIE'
-    
-    result['actual_winner'] = actual_winner
-    
-    # Check if bet won
-    if bet_team == actual_winner:
-        result['bet_won'] = True
-        payout = american_odds_to_payout(moneyline, bet_amount)
-        if payout is not None:
-            result['payout'] = payout
-            result['profit'] = payout - bet_amount
-    elif actual_winner == 'TIE':
-        result['bet_won'] = None
-        result['payout'] = bet_amount  # Push - get bet back
-        result['profit'] = 0.0
-    else:
-        result['bet_won'] = False
-        result['payout'] = 0.0
-        result['profit'] = -bet_amount
-    
-    return result
+        actual_winner[i] = map_scoreboard_team(raw_winner, home_team[i], away_team[i])
+    actual_winner[~completed] = None
+    
+    won = completed & (bet_team == actual_winner)
+    tie = completed & ~won & (actual_winner == 'TIE')
+    lost = completed & ~won & ~tie
+    
+    # Payout as in american_odds_to_payout, on integer odds
+    win_payout = bet_amount * (1 + profit_per_dollar)
+    payout = np.select([won, tie], [win_payout, bet_amount], default=0.0)
+    profit = np.select([won, tie], [win_payout - bet_amount, 0.0], default=-bet_amount)
+    
+    bet_won = np.full(n, None, dtype=object)
+    bet_won[won] = True
+    bet_won[lost] = False
+    
+    return pd.DataFrame({
+        'game_id': col('game_id'),
+        'date': col('date'),
+        'away_team': col('away_team'),
+        'home_team': col('home_team'),
+        'predicted_winner': col('predicted_winner'),
+        'confidence': col('confidence'),
+        'bet_amount': bet_amount,
+        'moneyline': np.where(has_moneyline, raw_moneyline, None),
+        'actual_winner': actual_winner,
+        'bet_won': bet_won,
+        'payout': payout,
+        'profit': profit,
+        'has_moneyline': has_moneyline
+    }, index=df.index)
 
 
 def generate_betting_report():
@@ -321,43 +348,30 @@ def generate_betting_report():
             # Fill missing values from completed games
             merged[ml_col] = merged[ml_col].fillna(merged[f'{ml_col}_completed'])
     
-    # Calculate bet results for each game
-    bet_results = []
+    # Detect mismatch only if canonical forms differ and neither contains the other (reduce noise)
     mismatch_count = 0
-    for _, row in merged.iterrows():
-        # Detect mismatch only if canonical forms differ and neither contains the other (reduce noise)
-        if 'home_team_completed' in row and 'home_team' in row:
-            comp = row['home_team_completed']
-            pred = row['home_team']
-            if pd.notna(comp) and pd.notna(pred):
-                comp_can = canonicalize_team_name(comp)
-                pred_can = canonicalize_team_name(pred)
-                if comp_can != pred_can and pred_can not in comp_can and comp_can not in pred_can:
-                    mismatch_count += 1
-        result = calculate_bet_result(row)
-        if result['has_moneyline'] and result['actual_winner'] is not None:
-            bet_results.append(result)
-    
-    if not bet_results:
+    if 'home_team_completed' in merged.columns and 'home_team' in merged.columns:
+        labels = merged[['home_team_completed', 'home_team']].dropna()
+        for comp, pred in zip(labels['home_team_completed'], labels['home_team']):
+            comp_can = canonicalize_team_name(comp)
+            pred_can = canonicalize_team_name(pred)
+            if comp_can != pred_can and pred_can not in comp_can and comp_can not in pred_can:
+                mismatch_count += 1
+    
+    # Calculate bet results for all games at once
+    bets_df = calculate_bet_results_vec(merged)
+    bets_df = bets_df[bets_df['has_moneyline'] & bets_df['actual_winner'].notna()]
+    
+    if bets_df.empty:
         print("✗ No bets with moneylines and completed results found")
         return pd.DataFrame()
     
-    bets_df = pd.DataFrame(bet_results)
-    
-    # Determine real odds directly from moneyline presence & bettability instead of relying on completed.has_real_odds
-    # This avoids losing tracking if the scraper fails to populate has_real_odds in Completed_Games.csv
-    real_odds_mask = []
-    for _, bet in bets_df.iterrows():
-        ml = bet.get('moneyline')
-        real_odds_mask.append(ml is not None and pd.notna(ml) and ml != '' and is_bettable_moneyline(ml))
-    real_bets = bets_df[real_odds_mask].copy()
-    if real_bets.empty:
-        print("✗ No completed bets with usable moneylines found (moneyline missing or unbettable)")
-        return pd.DataFrame()
-    print(f"✓ Retained {len(real_bets)} completed bets with usable moneylines")
+    # has_moneyline already requires a present, bettable moneyline, so real odds are
+    # determined from the moneyline itself rather than completed.has_real_odds
+    bets_df = bets_df.reset_index(drop=True).infer_objects()
+    print(f"✓ Retained {len(bets_df)} completed bets with usable moneylines")
     if mismatch_count > 0:
         print(f"⚠️ Detected {mismatch_count} home/away label mismatches between predictions and completed games; using scoreboard teams for actual results.")
-    bets_df = real_bets
     
     # Don't filter to one bet per day anymore - we'll handle that in the markdown generation
     # We want to track both strategies: safest bet AND best value bet
@@ -408,36 +422,29 @@ def get_todays_bets(today_preds):
     except Exception:
         return result
     
-    # Add bettable moneyline filter
-    def is_row_bettable(row):
-        if row['predicted_home_win'] == 1:
-            ml = row.get('home_moneyline')
-        else:
-            ml = row.get('away_moneyline')
-        return is_bettable_moneyline(ml)
+    # Profit per dollar on the predicted winner's moneyline; NaN where the
+    # line is missing or unbettable (same rule as is_bettable_moneyline)
+    profit_per_dollar = _profit_per_dollar(predicted_moneyline(bettable_games))
+    bettable_mask = ~np.isnan(profit_per_dollar)
     
     # Filter to only bettable games
-    bettable = bettable_games[bettable_games.apply(is_row_bettable, axis=1)].copy()
+    bettable = bettable_games[bettable_mask].copy()
+    profit_per_dollar = profit_per_dollar[bettable_mask]
     
     if len(bettable) == 0:
         return result
     
     # Safest bet: highest confidence
-    result['safest_bet'] = bettable.sort_values('confidence', ascending=False).iloc[0]
-    
-    # Best value bet: calculate value scores
-    def calc_value(row):
-        if row['predicted_home_win'] == 1:
-            ml = row.get('home_moneyline')
-        else:
-            ml = row.get('away_moneyline')
-        return calculate_value_score(row['confidence'], ml)
+    confidence = pd.to_numeric(bettable['confidence'], errors='coerce')
+    safest_pos = confidence.argmax() if confidence.notna().any() else 0
+    result['safest_bet'] = bettable.iloc[safest_pos]
     
-    bettable['value_score'] = bettable.apply(calc_value, axis=1)
-    bettable_with_scores = bettable[bettable['value_score'].notna()].copy()
+    # Best value bet: expected profit per dollar (see calculate_value_score)
+    bettable['value_score'] = confidence.to_numpy() * (1 + profit_per_dollar) - 1.0
+    value_scores = bettable['value_score']
     
-    if len(bettable_with_scores) > 0:
-        result['value_bet'] = bettable_with_scores.sort_values('value_score', ascending=False).iloc[0]
+    if value_scores.notna().any():
+        result['value_bet'] = bettable.iloc[value_scores.argmax()]
     
     return result
 
@@ -146,23 +146,23 @@ def track_accuracy():
     # Use the actual game date from completed games, not today's date
     date_col = 'date_actual' if 'date_actual' in merged.columns else 'date'
     
-    # Group by date and calculate metrics for each day
-    daily_reports = []
-    for game_date, day_games in merged.groupby(date_col):
-        daily_accuracy = day_games['correct'].mean()
-        daily_report = {
-            'date': game_date,
-            'total_predictions': len(day_games),
-            'games_completed': len(day_games),
-            'correct_predictions': int(day_games['correct'].sum()),
-            'accuracy': daily_accuracy,
-            'avg_confidence': day_games['confidence'].mean(),
-            'config_version': _config_version,
-            'commit_hash': _commit_hash
-        }
-        daily_reports.append(daily_report)
-    
-    report_df = pd.DataFrame(daily_reports)
+    # Group by date and calculate metrics for each day in one aggregation pass
+    report_df = (
+        merged.groupby(date_col)
+        .agg(
+            total_predictions=('correct', 'size'),
+            games_completed=('correct', 'size'),
+            correct_predictions=('correct', 'sum'),
+            accuracy=('correct', 'mean'),
+            avg_confidence=('confidence', 'mean'),
+        )
+        .rename_axis('date')
+        .reset_index()
+    )
+    report_df['correct_predictions'] = report_df['correct_predictions'].astype(int)
+    report_df['config_version'] = _config_version
+    report_df['commit_hash'] = _commit_hash
+    dates_updated = len(report_df)
     
     # Append to existing report if it exists, avoiding duplicates
     if os.path.exists(report_path):
@@ -174,7 +174,7 @@ def track_accuracy():
         report_df = report_df.sort_values('date').reset_index(drop=True)
     
     report_df.to_csv(report_path, index=False)
-    print(f"\n✓ Saved accuracy report to {report_path} ({len(daily_reports)} date(s) updated)")
+    print(f"\n✓ Saved accuracy report to {report_path} ({dates_updated} date(s) updated)")
     
     # Save detailed results for streak tracking
     detailed_path = os.path.join(data_dir, 'Prediction_Details.csv')
@@ -154,6 +154,7 @@ class AdaptivePredictor:
         xgb_colsample_bytree=0.8,
         xgb_reg_alpha=0.1,  # Optimized: Minimal regularization performs best
         xgb_reg_lambda=1.0,  # Optimized: Balanced L2
+        xgb_n_jobs=-1,  # XGBoost threads (-1 = all cores)
         # RandomForest-specific hyperparameters (Week 2 tuning)
         rf_max_features='sqrt',
         rf_min_samples_leaf=10,
@@ -198,7 +199,7 @@ class AdaptivePredictor:
                     reg_alpha=xgb_reg_alpha,     # L1 regularization (Week 2)
                     reg_lambda=xgb_reg_lambda,   # L2 regularization (Week 2)
                     random_state=42,
-                    n_jobs=-1,
+                    n_jobs=xgb_n_jobs,
                     verbosity=0,
                 )
                 print("  Using XGBoost model (Phase 3)")
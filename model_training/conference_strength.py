@@ -11,6 +11,8 @@ from typing import Dict, Optional, Tuple
 import json
 import os
 
+from model_training.team_id_utils import map_by_team
+
 
 # Known conference mappings (subset of major conferences)
 MAJOR_CONFERENCES = {
@@ -289,16 +291,16 @@ def add_conference_features(df: pd.DataFrame,
     """
     df = df.copy()
     
-    df['home_conf_rating'] = df['home_team'].apply(
-        conference_strength.get_team_conference_rating
+    df['home_conf_rating'] = map_by_team(
+        df['home_team'], conference_strength.get_team_conference_rating
     )
-    df['away_conf_rating'] = df['away_team'].apply(
-        conference_strength.get_team_conference_rating
+    df['away_conf_rating'] = map_by_team(
+        df['away_team'], conference_strength.get_team_conference_rating
     )
     df['conf_rating_diff'] = df['home_conf_rating'] - df['away_conf_rating']
     
-    df['home_conference'] = df['home_team'].apply(conference_strength.get_conference)
-    df['away_conference'] = df['away_team'].apply(conference_strength.get_conference)
+    df['home_conference'] = map_by_team(df['home_team'], conference_strength.get_conference)
+    df['away_conference'] = map_by_team(df['away_team'], conference_strength.get_conference)
     df['is_conf_game'] = df['home_conference'] == df['away_conference']
     
     return df
@@ -18,6 +18,8 @@ import numpy as np
 import sys
 import os
 import json
+import functools
+import warnings
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Any
@@ -39,6 +41,31 @@ except ImportError:
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+
+@functools.lru_cache(maxsize=1)
+def xgboost_cuda_available() -> bool:
+    """
+    Check whether XGBoost can actually train on a CUDA device.
+    
+    A CUDA-enabled build silently falls back to CPU when no GPU is visible,
+    so train a one-round probe booster and inspect the device it resolved to.
+    """
+    if not HAS_XGBOOST or not xgb.build_info().get('USE_CUDA'):
+        return False
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            booster = xgb.train(
+                {'device': 'cuda', 'tree_method': 'hist'},
+                xgb.DMatrix(np.zeros((2, 1)), label=[0, 1]),
+                num_boost_round=1,
+            )
+        config = json.loads(booster.save_config())
+    except Exception:
+        return False
+    return str(config['learner']['generic_param'].get('device', 'cpu')).startswith('cuda')
+
+
 # Load feature flags
 try:
     with open(Path('config') / 'feature_flags.json') as f:
@@ -79,6 +106,10 @@ class EnsemblePredictor:
         'verbosity': 0,
     }
     
+    # Minimum training rows before device='auto' moves XGBoost onto a GPU;
+    # below this, transfer overhead outweighs any speedup
+    GPU_MIN_ROWS = 10000
+    
     # Default RandomForest parameters
     DEFAULT_RF_PARAMS = {
         'n_estimators': 150,
@@ -109,6 +140,7 @@ class EnsemblePredictor:
         validation_days: int = 14,
         calibrate: bool = True,
         feature_importance_path: str = 'data/Ensemble_Feature_Importance.csv',
+        device: str = 'auto',
     ):
         """
         Initialize the ensemble predictor.
@@ -124,6 +156,8 @@ class EnsemblePredictor:
             validation_days: Days to hold out for validation
             calibrate: Whether to calibrate probabilities
             feature_importance_path: Path to save feature importance
+            device: XGBoost device ('cpu', 'cuda', or 'auto' to use a GPU
+                when one is available and the training set is large enough)
         """
         self.weights = weights or self.DEFAULT_WEIGHTS.copy()
         self.xgb_params = {**self.DEFAULT_XGB_PARAMS, **(xgb_params or {})}
@@ -136,6 +170,8 @@ class EnsemblePredictor:
         self.validation_days = validation_days
         self.calibrate = calibrate
         self.feature_importance_path = feature_importance_path
+        self.device = device
+        self.xgb_device: Optional[str] = None  # Device XGBoost actually trained on
         
         # Models storage
         self.models: Dict[str, Any] = {}
@@ -168,17 +204,35 @@ class EnsemblePredictor:
         total = sum(active_weights.values())
         if total > 0:
             self.weights = {k: v / total for k, v in active_weights.items()}
+            # Absorb rounding error in the last entry so the weights sum to exactly 1.0
+            *head, last = self.weights
+            self.weights[last] = 1.0 - sum(self.weights[k] for k in head)
         else:
             # Fallback to random forest only
             self.use_random_forest = True
             self.weights = {'random_forest': 1.0}
     
-    def _create_xgboost_model(self) -> Any:
+    def _resolve_xgb_device(self, n_rows: int) -> str:
+        """Pick the XGBoost device for a training set of n_rows."""
+        if 'device' in self.xgb_params:
+            return self.xgb_params['device']
+        if self.device != 'auto':
+            return self.device
+        if n_rows >= self.GPU_MIN_ROWS and xgboost_cuda_available():
+            return 'cuda'
+        return 'cpu'
+    
+    def _create_xgboost_model(self, n_rows: int = 0) -> Any:
         """Create XGBoost classifier with optimized parameters."""
         if not HAS_XGBOOST:
             raise ImportError("XGBoost not installed")
         
-        return xgb.XGBClassifier(**self.xgb_params)
+        params = dict(self.xgb_params)
+        self.xgb_device = self._resolve_xgb_device(n_rows)
+        if self.xgb_device != 'cpu':
+            # Only pass device when leaving the CPU so older XGBoost builds still work
+            params['device'] = self.xgb_device
+        return xgb.XGBClassifier(**params)
     
     def _create_rf_model(self) -> RandomForestClassifier:
         """Create RandomForest classifier."""
@@ -188,10 +242,10 @@ class EnsemblePredictor:
         """Create LogisticRegression classifier."""
         return LogisticRegression(**self.lr_params)
     
+    @staticmethod
     def create_temporal_split(
-        self, 
         df: pd.DataFrame, 
-        val_days: int = None
+        val_days: int = 14
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Create train/validation split respecting temporal order.
@@ -201,14 +255,11 @@ class EnsemblePredictor:
         
         Args:
             df: Full dataset with 'date' column
-            val_days: Days to hold out for validation (default: self.validation_days)
+            val_days: Days to hold out for validation
             
         Returns:
             (train_df, val_df) tuple
         """
-        if val_days is None:
-            val_days = self.validation_days
-        
         df = df.copy()
         
         # Ensure date column exists and is datetime
@@ -229,11 +280,10 @@ class EnsemblePredictor:
         max_date = df['date'].max()
         val_cutoff = max_date - timedelta(days=val_days)
         
-        train_mask = df['date'] < val_cutoff
-        val_mask = df['date'] >= val_cutoff
-        
-        train_df = df[train_mask]
-        val_df = df[val_mask]
+        # Dates are sorted, so the split is a single positional cut
+        split = df['date'].searchsorted(val_cutoff)
+        train_df = df.iloc[:split]
+        val_df = df.iloc[split:]
         
         print(f"  Temporal split: {len(train_df)} train, {len(val_df)} validation (last {val_days} days)")
         
@@ -253,7 +303,7 @@ class EnsemblePredictor:
         print("Training ensemble predictor (Phase 3)...")
         
         # Create temporal split
-        train_df, val_df = self.create_temporal_split(df)
+        train_df, val_df = self.create_temporal_split(df, self.validation_days)
         
         if len(train_df) < 100:
             print("  Warning: Small training set, reducing validation period")
@@ -344,7 +394,7 @@ class EnsemblePredictor:
         """Train XGBoost model."""
         print("    Training XGBoost...")
         
-        model = self._create_xgboost_model()
+        model = self._create_xgboost_model(len(X_train))
         
         # Train with early stopping if validation set available
         if len(X_val) > 0:
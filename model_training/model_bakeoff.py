@@ -30,13 +30,10 @@ def calculate_sample_weights(df: pd.DataFrame, current_season: str) -> np.ndarra
     min_day = game_days.min()
     max_day = game_days.max()
     span_days = (max_day - min_day).days + 1
-    weights = []
-    for idx, row in df.iterrows():
-        base = 1.0
-        if row.get('season') == current_season:
-            # Recency factor scaled 1..2 (earliest -> ~1, latest -> ~2)
-            day_pos = (pd.to_datetime(row['game_day']) - min_day).days + 1
-            recency_factor = day_pos / span_days  # in (0,1]
-            base += recency_factor  # in (1,2]
-        weights.append(base)
-    return np.array(weights)
+    if 'season' not in df.columns:
+        return np.ones(len(df))
+    in_season = (df['season'] == current_season).to_numpy()
+    # Recency factor scaled 1..2 (earliest -> ~1, latest -> ~2)
+    day_pos = ((game_days - min_day).dt.days + 1).to_numpy()
+    recency_factor = day_pos / span_days  # in (0,1]
+    return np.where(in_season, 1.0 + recency_factor, 1.0)  # in (1,2] for current season
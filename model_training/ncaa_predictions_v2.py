@@ -33,7 +33,6 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, log_loss, roc_auc_score
-from sklearn.metrics import brier_score_loss
 from sklearn.impute import SimpleImputer
 from scipy.stats import randint, uniform
 from model_training.feature_store import load_feature_store
@@ -737,14 +736,29 @@ def calibration_report(y_true, y_proba, bins=10):
     """Return calibration dataframe and brier score."""
     import numpy as np
     import pandas as pd
-    brier = brier_score_loss(y_true, y_proba)
-    df = pd.DataFrame({'y_true': y_true, 'y_proba': y_proba})
-    df['bin'] = pd.cut(df['y_proba'], bins=bins, labels=False, include_lowest=True)
-    grouped = df.groupby('bin').agg(
-        bin_count=('y_true','count'),
-        mean_pred=('y_proba','mean'),
-        mean_actual=('y_true','mean')
-    ).reset_index()
+    y_true = np.asarray(y_true, dtype=float)
+    y_proba = np.asarray(y_proba, dtype=float)
+    diff = y_proba - y_true
+    brier = float(diff @ diff) / diff.size
+    
+    # Equal-width, right-closed bins over the observed range (as pd.cut)
+    lo, hi = y_proba.min(), y_proba.max()
+    if lo == hi:
+        lo -= 0.001 * abs(lo) if lo != 0 else 0.001
+        hi += 0.001 * abs(hi) if hi != 0 else 0.001
+    edges = np.linspace(lo, hi, bins + 1)
+    bin_idx = np.clip(np.digitize(y_proba, edges, right=True) - 1, 0, bins - 1)
+    
+    counts = np.bincount(bin_idx, minlength=bins)
+    pred_sums = np.bincount(bin_idx, weights=y_proba, minlength=bins)
+    actual_sums = np.bincount(bin_idx, weights=y_true, minlength=bins)
+    occupied = np.flatnonzero(counts)
+    grouped = pd.DataFrame({
+        'bin': occupied,
+        'bin_count': counts[occupied],
+        'mean_pred': pred_sums[occupied] / counts[occupied],
+        'mean_actual': actual_sums[occupied] / counts[occupied]
+    })
     grouped['abs_gap'] = (grouped['mean_pred'] - grouped['mean_actual']).abs()
     return brier, grouped
 
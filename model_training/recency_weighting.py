@@ -10,6 +10,18 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple, List
 
+from model_training.team_id_utils import map_by_team
+
+
+def _weighted_mean_by_team(codes: np.ndarray,
+                           values: np.ndarray,
+                           weights: np.ndarray,
+                           n_teams: int) -> np.ndarray:
+    """Weighted mean of ``values`` per integer team code in a single pass."""
+    num = np.bincount(codes, weights=weights * values, minlength=n_teams)
+    den = np.bincount(codes, weights=weights, minlength=n_teams)
+    return num / np.where(den > 0, den, 1.0)
+
 
 class RecencyWeighting:
     """
@@ -81,17 +93,27 @@ class RecencyWeighting:
         Calculate weighted average of values based on recency.
         
         Args:
-            values: List of values to average
-            dates: Corresponding dates for each value
+            values: List or array of values to average
+            dates: Corresponding dates for each value (datetimes, strings
+                or a datetime64 array)
             reference_date: Reference date for weighting
             
         Returns:
             Weighted average
         """
-        if not values or not dates:
+        if len(values) == 0 or len(dates) == 0:
             return 0.0
         
-        weights = [self.calculate_weight(d, reference_date) for d in dates]
+        if reference_date is None:
+            reference_date = datetime.now()
+        
+        # Same decay as calculate_weight, applied to all dates at once
+        days_ago = (pd.Timestamp(reference_date) - pd.to_datetime(np.asarray(dates))).days.to_numpy()
+        weights = np.where(
+            days_ago < 0,
+            1.0,  # Future games get full weight
+            np.maximum(0.01, 0.5 ** (days_ago / self.half_life_days))
+        )
         
         return np.average(values, weights=weights)
     
@@ -119,70 +141,74 @@ class RecencyWeighting:
         if reference_date is None:
             reference_date = pd.to_datetime(games_df['date'].max())
         
-        # Ensure date column is datetime
-        games_df = games_df.copy()
-        games_df['date'] = pd.to_datetime(games_df['date'])
+        n_games = len(games_df)
+        dates = pd.to_datetime(games_df['date']).to_numpy(dtype='datetime64[ns]')
+        home_score = self._score_array(games_df, 'home_score')
+        away_score = self._score_array(games_df, 'away_score')
+        home_team = games_df['home_team'].to_numpy(dtype=object)
+        away_team = games_df['away_team'].to_numpy(dtype=object)
         
-        # Calculate momentum for each team
-        all_teams = set(games_df['home_team'].unique()) | set(games_df['away_team'].unique())
+        # One row per (team, game); a game a team plays against itself counts once
+        not_self = away_team != home_team
+        teams = np.concatenate([home_team, away_team[not_self]])
+        won = np.concatenate([home_score > away_score, (away_score > home_score)[not_self]])
+        game_pos = np.concatenate([np.arange(n_games), np.flatnonzero(not_self)])
+        team_dates = np.concatenate([dates, dates[not_self]])
+        codes, uniques = pd.factorize(teams)
+        n_teams = len(uniques)
         
-        for team in all_teams:
-            # Get team's recent games
-            team_games = games_df[
-                (games_df['home_team'] == team) | (games_df['away_team'] == team)
-            ].sort_values('date', ascending=False)
-            
-            if len(team_games) < self.min_games:
+        # Group by team, newest game first, ties in original row order
+        order = np.lexsort((game_pos, -team_dates.astype(np.int64), codes))
+        codes, won, team_dates = codes[order], won[order].astype(np.int8), team_dates[order]
+        games_per_team = np.bincount(codes, minlength=n_teams)
+        starts = np.concatenate([[0], np.cumsum(games_per_team)[:-1]])
+        rank = np.arange(codes.size) - starts[codes]
+        
+        # Only each team's last 10 games feed the momentum score
+        recent = rank < 10
+        codes, won, team_dates, rank = codes[recent], won[recent], team_dates[recent], rank[recent]
+        recent_starts = np.concatenate([[0], np.cumsum(np.minimum(games_per_team, 10))[:-1]])
+        
+        # Same decay as calculate_weight / calculate_weighted_average
+        days_ago = (np.datetime64(pd.Timestamp(reference_date), 'ns') - team_dates) // np.timedelta64(1, 'D')
+        weights = np.where(
+            days_ago < 0,
+            1.0,
+            np.maximum(0.01, 0.5 ** (days_ago / self.half_life_days))
+        )
+        weighted_win_rate = _weighted_mean_by_team(codes, won, weights, n_teams)
+        
+        # Streak: length of the leading run matching the most recent result
+        first_result = won[recent_starts]
+        run_breaks = np.where(won != first_result[codes], rank, 10)
+        streak_len = np.minimum.reduceat(run_breaks, recent_starts)
+        streak_len = np.minimum(streak_len, np.minimum(games_per_team, 10))
+        streaks = np.where(first_result == 1, streak_len, -streak_len)
+        
+        # Momentum: weighted win rate + streak bonus, scaled -1 (cold) to +1 (hot)
+        streak_bonus = np.minimum(np.abs(streaks), 5) * 0.05 * np.where(streaks > 0, 1, -1)
+        momentum = np.clip((weighted_win_rate - 0.5) * 2 + streak_bonus, -1.0, 1.0)
+        
+        for code, team in enumerate(uniques):
+            if games_per_team[code] < self.min_games:
                 self.team_momentum[team] = 0.0
                 self.team_streak[team] = 0
                 continue
-            
-            # Calculate weighted win rate
-            results = []
-            margins = []
-            dates = []
-            
-            for _, game in team_games.head(10).iterrows():  # Last 10 games
-                is_home = game['home_team'] == team
-                home_score = game.get('home_score', 0) or 0
-                away_score = game.get('away_score', 0) or 0
-                
-                if is_home:
-                    won = home_score > away_score
-                    margin = home_score - away_score
-                else:
-                    won = away_score > home_score
-                    margin = away_score - home_score
-                
-                results.append(1 if won else 0)
-                margins.append(margin)
-                dates.append(game['date'])
-            
-            self.team_last_results[team] = results[:5]  # Store last 5 results
-            
-            # Calculate weighted win rate
-            weighted_win_rate = self.calculate_weighted_average(results, dates, reference_date)
-            
-            # Calculate streak
-            streak = 0
-            if results:
-                current = results[0]
-                for r in results:
-                    if r == current:
-                        streak += 1 if current == 1 else -1
-                    else:
-                        break
-            self.team_streak[team] = streak
-            
-            # Calculate momentum: weighted win rate + streak bonus
-            # Scale: -1 (cold) to +1 (hot)
-            streak_bonus = min(abs(streak), 5) * 0.05 * (1 if streak > 0 else -1)
-            momentum = (weighted_win_rate - 0.5) * 2 + streak_bonus
-            
-            self.team_momentum[team] = np.clip(momentum, -1.0, 1.0)
+            start = recent_starts[code]
+            end = start + min(games_per_team[code], 5)
+            self.team_last_results[team] = won[start:end].tolist()  # Store last 5 results
+            self.team_streak[team] = int(streaks[code])
+            self.team_momentum[team] = momentum[code]
         
         return self.team_momentum
     
+    @staticmethod
+    def _score_array(games_df: pd.DataFrame, col: str) -> np.ndarray:
+        """Return a score column as floats, treating a missing column as all zeros."""
+        if col not in games_df.columns:
+            return np.zeros(len(games_df))
+        return games_df[col].to_numpy(dtype=float, na_value=np.nan)
+    
     def get_momentum(self, team: str) -> float:
         """Get momentum score for a team."""
         return self.team_momentum.get(team, 0.0)
@@ -225,15 +251,15 @@ def add_momentum_features(df: pd.DataFrame,
     if games_df is not None and not recency.team_momentum:
         recency.calculate_momentum(games_df)
     
-    df['home_momentum'] = df['home_team'].apply(recency.get_momentum)
-    df['away_momentum'] = df['away_team'].apply(recency.get_momentum)
+    df['home_momentum'] = map_by_team(df['home_team'], recency.get_momentum)
+    df['away_momentum'] = map_by_team(df['away_team'], recency.get_momentum)
     df['momentum_diff'] = df['home_momentum'] - df['away_momentum']
     
-    df['home_streak'] = df['home_team'].apply(recency.get_streak)
-    df['away_streak'] = df['away_team'].apply(recency.get_streak)
+    df['home_streak'] = map_by_team(df['home_team'], recency.get_streak)
+    df['away_streak'] = map_by_team(df['away_team'], recency.get_streak)
     
-    df['home_is_hot'] = df['home_team'].apply(recency.is_hot)
-    df['away_is_hot'] = df['away_team'].apply(recency.is_hot)
+    df['home_is_hot'] = map_by_team(df['home_team'], recency.is_hot)
+    df['away_is_hot'] = map_by_team(df['away_team'], recency.is_hot)
     
     return df
 
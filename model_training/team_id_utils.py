@@ -13,12 +13,15 @@ Rationale:
 Public Functions:
 - derive_team_id(raw_name: str) -> str
 - ensure_team_ids(df: pd.DataFrame, home_col="home_team", away_col="away_team") -> pd.DataFrame
+- map_by_team(teams: pd.Series, func) -> pd.Series
 
 """
 from __future__ import annotations
+import functools
 import hashlib
+import numpy as np
 import pandas as pd
-from typing import Iterable
+from typing import Any, Callable, Iterable
 from data_collection.team_name_utils import normalize_team_name
 
 PREFIX = "name_"  # prefix for generated IDs
@@ -30,10 +33,12 @@ def _canonical(name: str) -> str:
     return normalize_team_name(name).strip().lower()
 
 
+@functools.lru_cache(maxsize=4096)
 def derive_team_id(raw_name: str) -> str:
     """Return a deterministic pseudo-ID from a raw or canonical team name.
 
     We normalize, lower-case, then SHA1 hash and keep first 12 hex chars.
+    Results are memoized; the team universe is small and names repeat across games.
     """
     canon = _canonical(raw_name)
     if not canon:
@@ -63,6 +68,21 @@ def ensure_team_ids(df: pd.DataFrame, home_col: str = "home_team", away_col: str
     return out
 
 
+def map_by_team(teams: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """Apply a per-team lookup once per distinct team and broadcast by integer code.
+
+    Equivalent to ``teams.apply(func)`` but calls ``func`` once per team rather than
+    once per row. Object and categorical team columns are handled alike (categoricals
+    reuse their codes), and the result is always a plain, non-categorical Series.
+    """
+    codes, uniques = pd.factorize(teams)
+    values = [func(team) for team in uniques]
+    if (codes < 0).any():
+        # Missing names get code -1, which indexes this trailing func(NaN) entry
+        values.append(func(teams[codes < 0].iloc[0]))
+    return pd.Series(np.asarray(values)[codes], index=teams.index)
+
+
 def melt_games_to_team_rows(df: pd.DataFrame) -> pd.DataFrame:
     """Return per-team perspective rows from a game-level dataframe.
 
@@ -134,4 +154,4 @@ def melt_games_to_team_rows(df: pd.DataFrame) -> pd.DataFrame:
         })
     return pd.DataFrame(rows)
 
-__all__ = ["derive_team_id", "ensure_team_ids", "melt_games_to_team_rows"]
+__all__ = ["derive_team_id", "ensure_team_ids", "map_by_team", "melt_games_to_team_rows"]
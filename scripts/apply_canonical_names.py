@@ -55,6 +55,20 @@ try:
         print("   ✓ Added away_team_canonical column")
     else:
         print("   ℹ️  away_team_canonical column already exists")
+    
+    # Index the columns used by per-team lookups and season filters
+    db.execute("CREATE INDEX IF NOT EXISTS idx_games_canonical ON games(home_team_canonical, away_team_canonical)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_games_season_status ON games(season, game_status)")
+    # Covering indexes for per-side record aggregation and team lookups
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_games_season_status_home
+        ON games(season, game_status, home_team_canonical, home_score, away_score)
+    """)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_games_season_status_away
+        ON games(season, game_status, away_team_canonical, home_score, away_score)
+    """)
+    print("   ✓ Canonical and season/status indexes in place")
         
 except Exception as e:
     print(f"   ❌ Error adding columns: {e}")
@@ -141,6 +155,9 @@ if updates:
 else:
     print("   ℹ️  No updates needed - all games already have canonical names")
 
+# Refresh statistics so the planner sees the new canonical/season indexes
+db.analyze()
+
 # Step 7: Verify results
 print("\n7. Verifying updates...")
 verification = db.fetch_one("""
@@ -38,11 +38,10 @@ def test_calibration():
     print()
     
     # Load data
-    db = get_db_connection()
-    games_repo = GamesRepository(db)
-    
     print("Loading completed games...")
-    completed_games = games_repo.get_completed_games_df()
+    with get_db_connection() as db:
+        games_repo = GamesRepository(db)
+        completed_games = games_repo.get_completed_games_df()
     
     # Filter to current season
     current_season = completed_games[completed_games['season'] == '2025-26'].copy()
@@ -216,8 +215,6 @@ def test_calibration():
     
     print()
     print("="*80)
-    
-    db.close()
 
 
 if __name__ == '__main__':
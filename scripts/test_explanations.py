@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.repositories.games_repository import GamesRepository
 from backend.database import get_db_connection
 from model_training.adaptive_predictor import AdaptivePredictor
+import numpy as np
 import pandas as pd
 
 def main():
@@ -21,12 +22,11 @@ def main():
     print()
     
     # Load data
-    db = get_db_connection()
-    games_repo = GamesRepository(db)
-    completed_games = games_repo.get_completed_games_df()
-    
-    # Use recent games for training
-    recent = completed_games.tail(1000).copy()
+    with get_db_connection() as db:
+        games_repo = GamesRepository(db)
+        
+        # Use recent games for training
+        recent = games_repo.get_completed_games_df(last=True, limit=1000)
     
     # Split: train on most, predict on last 10
     train_data = recent.iloc[:-10].copy()
@@ -54,6 +54,16 @@ def main():
     print("="*80)
     print()
     
+    # Index actual results by game for O(1) lookup while printing
+    has_scores = 'home_score' in predict_data.columns and 'away_score' in predict_data.columns
+    if has_scores:
+        predict_lookup = predict_data.set_index('game_id')
+        predict_lookup['actual_winner'] = np.where(
+            predict_lookup['home_score'].values > predict_lookup['away_score'].values,
+            predict_lookup['home_team'].values,
+            predict_lookup['away_team'].values
+        )
+    
     # Display predictions
     for idx, row in predictions.iterrows():
         print(f"📍 {row['away_team']} @ {row['home_team']}")
@@ -66,15 +76,12 @@ def main():
             print("   💡 No explanation available")
         
         # Show actual result if available
-        if 'home_score' in predict_data.columns and 'away_score' in predict_data.columns:
-            game = predict_data[predict_data['game_id'] == row['game_id']].iloc[0]
-            actual_winner = game['home_team'] if game['home_score'] > game['away_score'] else game['away_team']
-            correct = "✅" if actual_winner == row['predicted_winner'] else "❌"
+        if has_scores:
+            game = predict_lookup.loc[row['game_id']]
+            correct = "✅" if game['actual_winner'] == row['predicted_winner'] else "❌"
             print(f"   Actual: {game['away_team']} {game['away_score']}, {game['home_team']} {game['home_score']} {correct}")
         
         print()
-    
-    db.close()
 
 if __name__ == '__main__':
     main()
@@ -13,8 +13,63 @@ from backend.repositories.games_repository import GamesRepository
 from backend.database import get_db_connection
 from model_training.adaptive_predictor import AdaptivePredictor
 from model_training.calibration_metrics import expected_calibration_error
+from joblib import Parallel, delayed
+import numpy as np
+import shutil
+import tempfile
 import pandas as pd
 
+def run(train_data, test_data, remove_useless_features, xgb_n_jobs=-1,
+        feature_importance_path='data/Adaptive_Feature_Importance.csv'):
+    """
+    Train one model variant and evaluate it on the test split.
+    
+    Concurrent variants need distinct feature_importance_path values, since
+    fit() writes the file and predict() reads it back for explanations.
+    
+    Returns:
+        Tuple of (accuracy, ECE, high-confidence game count,
+        high-confidence accuracy, feature names or None)
+    """
+    model = AdaptivePredictor(
+        model_type='xgboost',
+        xgb_reg_alpha=0.5,
+        xgb_reg_lambda=2.0,
+        xgb_n_jobs=xgb_n_jobs,
+        remove_useless_features=remove_useless_features,
+        feature_importance_path=feature_importance_path,
+    )
+    
+    model.fit(train_data, use_validation=True, val_days=14)
+    
+    # Count features used
+    feature_names = None
+    if hasattr(model._raw_model, 'feature_names_in_'):
+        feature_names = list(model._raw_model.feature_names_in_)
+    
+    # Predict and evaluate
+    preds = model.predict(test_data)
+    results = test_data.set_index('game_id').join(
+        preds.set_index('game_id')[['predicted_winner', 'confidence']],
+        how='inner'
+    )
+    results['actual_winner'] = np.where(
+        results['home_score'].values > results['away_score'].values,
+        results['home_team'].values,
+        results['away_team'].values
+    )
+    results['correct'] = (results['predicted_winner'].values == results['actual_winner'].values).astype(np.int8)
+    
+    acc = results['correct'].mean()
+    ece = expected_calibration_error(results['correct'].values, results['confidence'].values)
+    
+    # High confidence
+    high = results[results['confidence'] >= 0.80]
+    high_acc = high['correct'].mean() if len(high) > 0 else None
+    
+    return acc, ece, len(high), high_acc, feature_names
+
+
 def test_feature_removal():
     print("="*80)
     print("TESTING FEATURE REMOVAL IMPACT")
@@ -22,10 +77,13 @@ def test_feature_removal():
     print()
     
     # Load data
-    db = get_db_connection()
-    games_repo = GamesRepository(db)
-    completed_games = games_repo.get_completed_games_df()
-    current_season = completed_games[completed_games['season'] == '2025-26'].copy()
+    with get_db_connection() as db:
+        games_repo = GamesRepository(db)
+        current_season = games_repo.get_completed_games_df(season='2025-26')
+    
+    # Scores fit in int16; halves memory traffic through training
+    for col in ('home_score', 'away_score'):
+        current_season[col] = pd.to_numeric(current_season[col], downcast='integer')
     
     # Split
     split_idx = int(len(current_season) * 0.85)
@@ -36,6 +94,25 @@ def test_feature_removal():
     print(f"Testing: {len(test_data)} games")
     print()
     
+    # Train both models concurrently, each with its own importances file
+    xgb_n_jobs = max(1, (os.cpu_count() or 2) // 2)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        importance_paths = {
+            remove_flag: os.path.join(tmp_dir, f'importance_remove_{remove_flag}.csv')
+            for remove_flag in (False, True)
+        }
+        result_with, result_without = Parallel(n_jobs=2, backend='loky')(
+            delayed(run)(train_data, test_data, remove_flag, xgb_n_jobs, importance_paths[remove_flag])
+            for remove_flag in (False, True)
+        )
+        # Leave the reduced model's importances in data/, as the sequential run did
+        if os.path.exists(importance_paths[True]):
+            os.makedirs('data', exist_ok=True)
+            shutil.copyfile(importance_paths[True], 'data/Adaptive_Feature_Importance.csv')
+    
+    acc_with, ece_with, high_with, high_acc_with, features_with = result_with
+    acc_without, ece_without, high_without, high_acc_without, features_without = result_without
+    
     # ================================================================
     # Model WITH Useless Features (30 features)
     # ================================================================
@@ -44,41 +121,14 @@ def test_feature_removal():
     print("="*80)
     print()
     
-    model_with = AdaptivePredictor(
-        model_type='xgboost',
-        xgb_reg_alpha=0.5,
-        xgb_reg_lambda=2.0,
-        remove_useless_features=False,  # Keep all features
-    )
-    
-    model_with.fit(train_data, use_validation=True, val_days=14)
-    
-    # Count features used
-    if hasattr(model_with._raw_model, 'feature_names_in_'):
-        features_with = list(model_with._raw_model.feature_names_in_)
+    if features_with is not None:
         print(f"Features used: {len(features_with)}")
         print()
     
-    # Predict and evaluate
-    preds_with = model_with.predict(test_data)
-    results_with = test_data.merge(preds_with[['game_id', 'predicted_winner', 'confidence']], on='game_id')
-    results_with['actual_winner'] = results_with.apply(
-        lambda row: row['home_team'] if row['home_score'] > row['away_score'] else row['away_team'],
-        axis=1
-    )
-    results_with['correct'] = (results_with['predicted_winner'] == results_with['actual_winner']).astype(int)
-    
-    acc_with = results_with['correct'].mean()
-    ece_with = expected_calibration_error(results_with['correct'].values, results_with['confidence'].values)
-    
     print(f"Accuracy: {acc_with:.1%}")
     print(f"ECE: {ece_with:.4f}")
-    
-    # High confidence
-    high_with = results_with[results_with['confidence'] >= 0.80]
-    if len(high_with) > 0:
-        high_acc_with = high_with['correct'].mean()
-        print(f"80%+ confidence: {len(high_with)} games, {high_acc_with:.1%} accurate")
+    if high_with > 0:
+        print(f"80%+ confidence: {high_with} games, {high_acc_with:.1%} accurate")
     
     # ================================================================
     # Model WITHOUT Useless Features (18 features)
@@ -88,47 +138,21 @@ def test_feature_removal():
     print("="*80)
     print()
     
-    model_without = AdaptivePredictor(
-        model_type='xgboost',
-        xgb_reg_alpha=0.5,
-        xgb_reg_lambda=2.0,
-        remove_useless_features=True,  # Remove useless features
-    )
-    
-    model_without.fit(train_data, use_validation=True, val_days=14)
-    
-    # Count features used
-    if hasattr(model_without._raw_model, 'feature_names_in_'):
-        features_without = list(model_without._raw_model.feature_names_in_)
+    if features_without is not None:
         print(f"Features used: {len(features_without)}")
-        print(f"Removed: {len(features_with) - len(features_without)} features")
-        print()
-        
-        removed = set(features_with) - set(features_without)
-        if removed:
-            print(f"Removed features: {', '.join(sorted(removed))}")
+        if features_with is not None:
+            print(f"Removed: {len(features_with) - len(features_without)} features")
             print()
-    
-    # Predict and evaluate
-    preds_without = model_without.predict(test_data)
-    results_without = test_data.merge(preds_without[['game_id', 'predicted_winner', 'confidence']], on='game_id')
-    results_without['actual_winner'] = results_without.apply(
-        lambda row: row['home_team'] if row['home_score'] > row['away_score'] else row['away_team'],
-        axis=1
-    )
-    results_without['correct'] = (results_without['predicted_winner'] == results_without['actual_winner']).astype(int)
-    
-    acc_without = results_without['correct'].mean()
-    ece_without = expected_calibration_error(results_without['correct'].values, results_without['confidence'].values)
+            
+            removed = set(features_with) - set(features_without)
+            if removed:
+                print(f"Removed features: {', '.join(sorted(removed))}")
+        print()
     
     print(f"Accuracy: {acc_without:.1%}")
     print(f"ECE: {ece_without:.4f}")
-    
-    # High confidence
-    high_without = results_without[results_without['confidence'] >= 0.80]
-    if len(high_without) > 0:
-        high_acc_without = high_without['correct'].mean()
-        print(f"80%+ confidence: {len(high_without)} games, {high_acc_without:.1%} accurate")
+    if high_without > 0:
+        print(f"80%+ confidence: {high_without} games, {high_acc_without:.1%} accurate")
     
     # ================================================================
     # COMPARISON
@@ -143,7 +167,7 @@ def test_feature_removal():
     print(f"{'Accuracy':<25} {acc_with:>14.1%} {acc_without:>14.1%} {(acc_without-acc_with):>11.1%}")
     print(f"{'ECE':<25} {ece_with:>14.4f} {ece_without:>14.4f} {(ece_without-ece_with):>11.4f}")
     
-    if len(high_with) > 0 and len(high_without) > 0:
+    if high_with > 0 and high_without > 0:
         print(f"{'High Conf Accuracy':<25} {high_acc_with:>14.1%} {high_acc_without:>14.1%} {(high_acc_without-high_acc_with):>11.1%}")
     
     print()
@@ -160,8 +184,6 @@ def test_feature_removal():
     
     print()
     print("="*80)
-    
-    db.close()
 
 if __name__ == '__main__':
     test_feature_removal()
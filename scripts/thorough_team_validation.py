@@ -1,19 +1,189 @@
 #!/usr/bin/env python3
 """
 Thorough validation of team records against ESPN.
-Fetches each team's record individually and checks for duplicates.
+Fetches team records from ESPN's bulk endpoints (falling back to per-team
+requests for any teams they miss) and checks for duplicates.
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import argparse
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from backend.database import get_db_connection
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import time
 import json
 
+try:
+    import requests_cache
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+ESPN_API_BASE = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball"
+
+# Cap on in-flight ESPN requests
+MAX_WORKERS = 16
+
+# On-disk ESPN response cache (used when requests-cache is installed)
+ESPN_CACHE_PATH = 'data/.espn_cache'
+ESPN_CACHE_TTL = 3600
+
+
+def create_session(use_cache=True):
+    """
+    Create the HTTP session used for ESPN requests.
+    
+    Connections are pooled (one per worker) and retried on transient errors;
+    responses are cached on disk if requests-cache is installed.
+    """
+    if HAS_REQUESTS_CACHE:
+        session = requests_cache.CachedSession(
+            ESPN_CACHE_PATH,
+            backend='sqlite',
+            expire_after=ESPN_CACHE_TTL,
+            allowable_codes=(200,)
+        )
+        if not use_cache:
+            session.cache.clear()
+    else:
+        session = requests.Session()
+    
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+def parse_json(response):
+    """Decode an ESPN JSON response."""
+    return orjson.loads(response.content) if HAS_ORJSON else response.json()
+
+
+def overall_record(items):
+    """
+    Extract the overall record from an ESPN record item list.
+    
+    Returns:
+        Dict with wins, losses and games, or None if no overall record is present
+    """
+    for item in items:
+        if item.get('type') == 'total' or item.get('description') == 'Overall Record':
+            stats = item.get('stats', [])
+            wins = 0
+            losses = 0
+            
+            for stat in stats:
+                if stat.get('name') == 'wins':
+                    wins = int(stat.get('value', 0))
+                elif stat.get('name') == 'losses':
+                    losses = int(stat.get('value', 0))
+            
+            return {
+                'wins': wins,
+                'losses': losses,
+                'games': wins + losses
+            }
+    
+    return None
+
+
+def fetch_bulk_records(session):
+    """
+    Fetch overall records for all teams using ESPN's bulk endpoints.
+    
+    Records embedded in the team listing are used first; the standings
+    endpoint fills in the rest.
+    
+    Returns:
+        Dict mapping ESPN team id (str) to a record dict
+    """
+    records = {}
+    
+    response = session.get(f"{ESPN_API_BASE}/teams?limit=400", timeout=10)
+    response.raise_for_status()
+    teams_data = parse_json(response)
+    
+    for league in teams_data.get('sports', [{}])[0].get('leagues', []):
+        for team_data in league.get('teams', []):
+            team = team_data.get('team', {})
+            record = overall_record(team.get('record', {}).get('items', []))
+            if record is not None:
+                records[str(team.get('id', ''))] = record
+    
+    response = session.get(f"{ESPN_API_BASE}/standings", timeout=10)
+    if response.status_code == 200:
+        standings_data = parse_json(response)
+        
+        for entry in standings_data.get('children', []):
+            for standing in entry.get('standings', {}).get('entries', []):
+                team_id = str(standing.get('team', {}).get('id', ''))
+                if not team_id or team_id in records:
+                    continue
+                
+                stat_values = {stat.get('name'): stat.get('value', 0) for stat in standing.get('stats', [])}
+                if 'wins' not in stat_values and 'losses' not in stat_values:
+                    continue
+                
+                wins = int(stat_values.get('wins', 0))
+                losses = int(stat_values.get('losses', 0))
+                records[team_id] = {
+                    'wins': wins,
+                    'losses': losses,
+                    'games': wins + losses
+                }
+    
+    return records
+
+
+def fetch_team_record(session, espn_id):
+    """
+    Fetch a single team's overall record from ESPN.
+    
+    Returns:
+        Dict with wins, losses and games, or None if no record was found
+    """
+    response = session.get(f"{ESPN_API_BASE}/teams/{espn_id}", timeout=10)
+    
+    # Light rate limiting per worker (cached responses skip the network)
+    if not getattr(response, 'from_cache', False):
+        time.sleep(0.05)
+    
+    if response.status_code != 200:
+        return None
+    
+    team_data = parse_json(response)
+    return overall_record(team_data.get('team', {}).get('record', {}).get('items', []))
+
+
+parser = argparse.ArgumentParser(description='Validate team records against ESPN')
+parser.add_argument(
+    '--no-cache',
+    action='store_true',
+    help='Clear cached ESPN responses and fetch everything fresh'
+)
+args = parser.parse_args()
+
 print("="*80)
 print("THOROUGH TEAM RECORD VALIDATION")
 print("="*80)
@@ -23,13 +193,18 @@ print()
 print("1. Loading ESPN team mappings...")
 import pandas as pd
 try:
-    mappings_df = pd.read_csv('data/espn_team_mappings.csv')
-    espn_teams = {}
-    for _, row in mappings_df.iterrows():
-        espn_teams[row['canonical_name']] = {
-            'espn_id': row['espn_id'],
-            'display_name': row['display_name']
-        }
+    mappings_df = pd.read_csv(
+        'data/espn_team_mappings.csv',
+        usecols=['canonical_name', 'espn_id', 'display_name']
+    )
+    espn_teams = {
+        canonical: {'espn_id': espn_id, 'display_name': display_name}
+        for canonical, espn_id, display_name in zip(
+            mappings_df['canonical_name'].to_numpy(),
+            mappings_df['espn_id'].to_numpy(),
+            mappings_df['display_name'].to_numpy()
+        )
+    }
     print(f"   ✓ Loaded {len(espn_teams)} team mappings")
 except Exception as e:
     print(f"   ❌ Error loading mappings: {e}")
@@ -38,95 +213,77 @@ except Exception as e:
 # Step 2: Get database records for all teams
 print("\n2. Fetching database records...")
 db = get_db_connection()
+# Release the DuckDB file lock even if a later step fails
+atexit.register(db.close)
 
 db_query = """
     SELECT 
-        team_name,
-        SUM(games) as games_played,
-        SUM(wins) as wins
-    FROM (
-        SELECT 
-            home_team_canonical as team_name,
-            COUNT(*) as games,
-            SUM(CASE WHEN home_score > away_score THEN 1 ELSE 0 END) as wins
-        FROM games 
-        WHERE season = '2025-26' AND game_status = 'Final'
-        GROUP BY home_team_canonical
-        
-        UNION ALL
-        
-        SELECT 
-            away_team_canonical as team_name,
-            COUNT(*) as games,
-            SUM(CASE WHEN away_score > home_score THEN 1 ELSE 0 END) as wins
-        FROM games 
-        WHERE season = '2025-26' AND game_status = 'Final'
-        GROUP BY away_team_canonical
-    )
-    GROUP BY team_name
-    HAVING SUM(games) > 0
+        t.team as team_name,
+        COUNT(*) as games_played,
+        SUM(CASE WHEN t.won THEN 1 ELSE 0 END) as wins
+    -- Each side carries its own result, so self-play rows count as one game per side
+    FROM games, UNNEST([
+        {'team': home_team_canonical, 'won': home_score > away_score},
+        {'team': away_team_canonical, 'won': away_score > home_score}
+    ]) AS u(t)
+    WHERE season = '2025-26' AND game_status = 'Final'
+    GROUP BY t.team
     ORDER BY team_name
 """
 
 db_records = {r['team_name']: r for r in db.fetch_all(db_query)}
 print(f"   ✓ Found {len(db_records)} teams with games")
 
-# Step 3: Fetch ESPN records for each team
-print("\n3. Fetching ESPN records (this will take a few minutes)...")
-print("   Checking teams with ESPN IDs...")
+# Step 3: Fetch ESPN records
+print("\n3. Fetching ESPN records...")
 
 espn_records = {}
 errors = []
-checked = 0
-total_to_check = len([t for t in db_records.keys() if t in espn_teams])
+# Only teams with both database games and an ESPN id are worth a lookup
+teams_to_check = sorted(db_records.keys() & espn_teams.keys())
 
-for team_name in db_records.keys():
-    if team_name not in espn_teams:
-        continue
-    
-    checked += 1
-    if checked % 20 == 0:
-        print(f"   Progress: {checked}/{total_to_check} teams checked...")
-    
-    espn_id = espn_teams[team_name]['espn_id']
+session = create_session(use_cache=not args.no_cache)
+
+try:
+    bulk_records = fetch_bulk_records(session)
+except Exception as e:
+    print(f"   ⚠️  Bulk fetch failed ({e}), falling back to per-team requests")
+    bulk_records = {}
+
+for team_name in teams_to_check:
+    record = bulk_records.get(str(espn_teams[team_name]['espn_id']))
+    if record is not None:
+        espn_records[team_name] = record
+
+print(f"   ✓ Bulk endpoints returned records for {len(espn_records)} teams")
+
+# Fetch any teams the bulk endpoints didn't cover individually
+remaining = [t for t in teams_to_check if t not in espn_records]
+if remaining:
+    print(f"   Checking {len(remaining)} remaining teams individually...")
+    checked = 0
+    total_to_check = len(remaining)
     
-    try:
-        # Fetch team detail from ESPN
-        url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams/{espn_id}"
-        response = requests.get(url, timeout=10)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_team_record, session, espn_teams[team_name]['espn_id']): team_name
+            for team_name in remaining
+        }
         
-        if response.status_code == 200:
-            team_data = response.json()
+        for future in as_completed(futures):
+            team_name = futures[future]
+            checked += 1
+            if checked % 20 == 0:
+                print(f"   Progress: {checked}/{total_to_check} teams checked...")
             
-            # Extract record from team data
-            record = team_data.get('team', {}).get('record', {})
-            items = record.get('items', [])
+            try:
+                record = future.result()
+            except Exception as e:
+                errors.append(f"{team_name}: {str(e)}")
+                continue
             
-            # Find overall record
-            for item in items:
-                if item.get('type') == 'total' or item.get('description') == 'Overall Record':
-                    stats = item.get('stats', [])
-                    wins = 0
-                    losses = 0
-                    
-                    for stat in stats:
-                        if stat.get('name') == 'wins':
-                            wins = int(stat.get('value', 0))
-                        elif stat.get('name') == 'losses':
-                            losses = int(stat.get('value', 0))
-                    
-                    espn_records[team_name] = {
-                        'wins': wins,
-                        'losses': losses,
-                        'games': wins + losses
-                    }
-                    break
-        
-        # Rate limiting
-        time.sleep(0.1)
-        
-    except Exception as e:
-        errors.append(f"{team_name}: {str(e)}")
+            if record is not None:
+                espn_records[team_name] = record
 
 print(f"   ✓ Fetched {len(espn_records)} team records from ESPN")
 if errors:
@@ -135,20 +292,69 @@ if errors:
 # Step 4: Check for duplicate games
 print("\n4. Checking for duplicate games...")
 
-duplicate_query = """
+# Duplicates, self-play games and null-score finals from a single scan of
+# this season's games
+data_quality_query = """
+    WITH season_games AS MATERIALIZED (
+        SELECT game_id, date, game_status, home_team_canonical, away_team_canonical, home_score, away_score
+        FROM games
+        WHERE season = '2025-26'
+    )
     SELECT 
+        'duplicate' as issue,
         home_team_canonical,
         away_team_canonical,
         date,
+        NULL as home_score,
+        NULL as away_score,
         COUNT(*) as count,
         GROUP_CONCAT(game_id) as game_ids
-    FROM games
-    WHERE season = '2025-26' AND game_status = 'Final'
+    FROM season_games
+    WHERE game_status = 'Final'
     GROUP BY home_team_canonical, away_team_canonical, date
     HAVING COUNT(*) > 1
+    
+    UNION ALL
+    
+    SELECT 'self_play', home_team_canonical, away_team_canonical, date, home_score, away_score, 1, CAST(game_id AS VARCHAR)
+    FROM season_games
+    WHERE home_team_canonical = away_team_canonical
+    
+    UNION ALL
+    
+    SELECT 'null_score_final', home_team_canonical, away_team_canonical, date, home_score, away_score, 1, CAST(game_id AS VARCHAR)
+    FROM season_games
+    WHERE game_status = 'Final'
+      AND (home_score IS NULL OR away_score IS NULL)
 """
 
-duplicates = db.fetch_all(duplicate_query)
+duplicates = []
+self_games = []
+null_score_finals = []
+
+for row in db.fetch_all(data_quality_query):
+    issue = row['issue']
+    if issue == 'duplicate':
+        duplicates.append({
+            'home_team_canonical': row['home_team_canonical'],
+            'away_team_canonical': row['away_team_canonical'],
+            'date': row['date'],
+            'count': row['count'],
+            'game_ids': row['game_ids']
+        })
+    else:
+        game = {
+            'game_id': row['game_ids'],
+            'date': row['date'],
+            'home_team_canonical': row['home_team_canonical'],
+            'away_team_canonical': row['away_team_canonical'],
+            'home_score': row['home_score'],
+            'away_score': row['away_score']
+        }
+        if issue == 'self_play':
+            self_games.append(game)
+        else:
+            null_score_finals.append(game)
 
 if duplicates:
     print(f"   ⚠️  Found {len(duplicates)} duplicate game sets:")
@@ -162,13 +368,6 @@ else:
 print("\n5. Checking for suspicious patterns...")
 
 # Teams playing themselves
-self_games = db.fetch_all("""
-    SELECT game_id, date, home_team_canonical, home_score, away_score
-    FROM games
-    WHERE season = '2025-26' 
-      AND home_team_canonical = away_team_canonical
-""")
-
 if self_games:
     print(f"   ⚠️  Found {len(self_games)} games where team plays itself:")
     for game in self_games[:5]:
@@ -177,14 +376,6 @@ else:
     print("   ✓ No self-play games found")
 
 # Games with null scores but marked Final
-null_score_finals = db.fetch_all("""
-    SELECT game_id, date, home_team_canonical, away_team_canonical, home_score, away_score
-    FROM games
-    WHERE season = '2025-26' 
-      AND game_status = 'Final'
-      AND (home_score IS NULL OR away_score IS NULL)
-""")
-
 if null_score_finals:
     print(f"   ⚠️  Found {len(null_score_finals)} 'Final' games with null scores:")
     for game in null_score_finals[:5]:
@@ -253,6 +444,25 @@ if mismatches:
     print("="*80)
     mismatches.sort(key=lambda x: x['diff'], reverse=True)
     
+    # Fetch game details for all mismatched teams in one query
+    mismatch_teams = [m['team'] for m in mismatches]
+    mismatch_set = set(mismatch_teams)
+    placeholders = ', '.join('?' * len(mismatch_teams))
+    mismatch_games = db.fetch_all(f"""
+        SELECT date, home_team, away_team, home_team_canonical, away_team_canonical, home_score, away_score
+        FROM games
+        WHERE season = '2025-26' AND game_status = 'Final'
+          AND (home_team_canonical IN ({placeholders}) OR away_team_canonical IN ({placeholders}))
+        ORDER BY date
+    """, tuple(mismatch_teams) * 2)
+    
+    games_by_team = defaultdict(list)
+    for g in mismatch_games:
+        if g['home_team_canonical'] in mismatch_set:
+            games_by_team[g['home_team_canonical']].append(g)
+        if g['away_team_canonical'] in mismatch_set and g['away_team_canonical'] != g['home_team_canonical']:
+            games_by_team[g['away_team_canonical']].append(g)
+    
     for m in mismatches:
         print(f"\n  {m['team']}:")
         print(f"    Database: {m['db_record']} ({m['db_games']} games)")
@@ -260,13 +470,7 @@ if mismatches:
         print(f"    Diff:     {m['diff']} game(s)")
         
         # Show game details for this team
-        games = db.fetch_all("""
-            SELECT date, home_team, away_team, home_team_canonical, away_team_canonical, home_score, away_score
-            FROM games
-            WHERE season = '2025-26' AND game_status = 'Final'
-              AND (home_team_canonical = ? OR away_team_canonical = ?)
-            ORDER BY date
-        """, (m['team'], m['team']))
+        games = games_by_team[m['team']]
         
         # Check for multiple original names
         orig_names = set()
@@ -313,11 +517,15 @@ report = {
     },
     'mismatches': mismatches,
     'close_matches': close_matches,
-    'duplicates': [dict(d) for d in duplicates] if duplicates else []
+    'duplicates': duplicates
 }
 
-with open('data/thorough_validation_report.json', 'w') as f:
-    json.dump(report, f, indent=2)
+if HAS_ORJSON:
+    with open('data/thorough_validation_report.json', 'wb') as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+else:
+    with open('data/thorough_validation_report.json', 'w') as f:
+        json.dump(report, f, indent=2, default=str)
 
 print("   ✓ Saved to data/thorough_validation_report.json")
 
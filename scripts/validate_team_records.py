@@ -8,218 +8,352 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import argparse
+import functools
+import gzip
+import hashlib
+import heapq
+import json
 import requests
 from backend.database import get_db_connection
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 
-print("="*80)
-print("VALIDATING TEAM RECORDS AGAINST ESPN")
-print("="*80)
-print()
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-# Step 1: Get ESPN teams with their records
-print("1. Fetching team records from ESPN...")
-url = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams?limit=500"
+# On-disk cache of raw ESPN responses, so repeated runs skip the network
+HTTP_CACHE_DIR = 'data/.http_cache'
+HTTP_CACHE_TTL = 300
 
-try:
-    response = requests.get(url, timeout=30)
+TEAMS_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams?limit=500"
+STANDINGS_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/standings"
+
+# Last successfully parsed ESPN records (used by --offline and on fetch errors)
+ESPN_SNAPSHOT_PATH = 'data/.espn_teams.json'
+
+# Shared keep-alive session so both ESPN requests reuse pooled connections
+session = requests.Session()
+session.headers.update({
+    'Accept-Encoding': 'gzip',
+    'User-Agent': 'ncaa-validator/1.0'
+})
+
+
+def cached_get(url, ttl=HTTP_CACHE_TTL):
+    """
+    GET a JSON URL, reusing an on-disk copy younger than ``ttl`` seconds.
+    
+    Responses are stored gzip'd under HTTP_CACHE_DIR, keyed by URL hash.
+    """
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    path = os.path.join(HTTP_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + '.json.gz')
+    
+    if os.path.exists(path):
+        with gzip.open(path, 'rb') as f:
+            entry = orjson.loads(f.read()) if HAS_ORJSON else json.load(f)
+        if time.time() - entry['fetched_at'] < ttl:
+            return entry['json']
+    
+    response = session.get(url, timeout=30)
     response.raise_for_status()
-    data = response.json()
+    data = orjson.loads(response.content) if HAS_ORJSON else response.json()
     
-    espn_records = {}
-    team_id_to_name = {}
+    entry = {'fetched_at': time.time(), 'json': data}
+    with gzip.open(path, 'wb') as f:
+        f.write(orjson.dumps(entry) if HAS_ORJSON else json.dumps(entry).encode())
+    return data
+
+
+def load_espn_snapshot():
+    """Load the last successfully parsed ESPN records, or None if absent."""
+    if not os.path.exists(ESPN_SNAPSHOT_PATH):
+        return None
+    with open(ESPN_SNAPSHOT_PATH, 'rb') as f:
+        return orjson.loads(f.read()) if HAS_ORJSON else json.load(f)
+
+
+def save_espn_snapshot(records):
+    """Persist parsed ESPN records for --offline runs and fetch failures."""
+    with open(ESPN_SNAPSHOT_PATH, 'wb') as f:
+        f.write(orjson.dumps(records) if HAS_ORJSON else json.dumps(records).encode())
+
+
+def qgrams(name, q=3):
+    """Set of lowercase character q-grams in a team name."""
+    name = name.lower()
+    return {name[i:i + q] for i in range(len(name) - q + 1)}
+
+
+def build_qgram_index(names):
+    """Map each q-gram to the names containing it, plus each name's q-grams."""
+    index = defaultdict(set)
+    name_grams = {}
+    for name in names:
+        grams = qgrams(name)
+        name_grams[name] = grams
+        for gram in grams:
+            index[gram].add(name)
+    return index, name_grams
+
+
+def suggest_names(name, index, name_grams, k=3, min_similarity=0.2):
+    """Top-k indexed names by q-gram Jaccard similarity to ``name``."""
+    grams = qgrams(name)
+    overlap = Counter()
+    for gram in grams:
+        overlap.update(index.get(gram, ()))
+    scored = (
+        (shared / (len(grams) + len(name_grams[candidate]) - shared), candidate)
+        for candidate, shared in overlap.items()
+    )
+    return [candidate for score, candidate in heapq.nlargest(k, scored) if score >= min_similarity]
+
+
+@functools.cache
+def fetch_team_list():
+    """ESPN id -> {'name', 'wins', 'losses', 'games'} for every listed team."""
+    data = cached_get(TEAMS_URL)
     
+    team_list = {}
     for league in data.get('sports', [{}])[0].get('leagues', []):
         for team_data in league.get('teams', []):
             team = team_data.get('team', {})
             
-            # Get team record from team data
-            record = team_data.get('team', {}).get('record', {})
-            
-            # Store by short name (what we use as canonical)
+            # Key by ESPN id; short name is what we use as canonical
             short_name = team.get('shortDisplayName', '')
             team_id = team.get('id', '')
             
             if short_name:
-                team_id_to_name[team_id] = short_name
-                espn_records[short_name] = {
+                team_list[team_id] = {
+                    'name': short_name,
                     'wins': 0,  # Will fetch from standings
                     'losses': 0,
                     'games': 0
                 }
+    return team_list
+
+
+@functools.cache
+def fetch_standings():
+    """ESPN id -> {'wins', 'losses', 'games'} from the current standings."""
+    standings_data = cached_get(STANDINGS_URL)
     
-    print(f"   ✓ Found {len(espn_records)} teams")
-    
-except Exception as e:
-    print(f"   ❌ Error fetching from ESPN: {e}")
-    sys.exit(1)
+    # ESPN standings can be complex - try to extract team records
+    standings = {}
+    for entry in standings_data.get('children', []):
+        for standing in entry.get('standings', {}).get('entries', []):
+            team_id = standing.get('team', {}).get('id', '')
+            stat_map = {stat.get('name'): stat.get('value', 0) for stat in standing.get('stats', [])}
+            standings[team_id] = {
+                'wins': int(stat_map.get('wins', 0)),
+                'losses': int(stat_map.get('losses', 0)),
+                'games': int(stat_map.get('gamesPlayed', 0))
+            }
+    return standings
 
-# Step 2: Fetch current standings from ESPN
-print("\n2. Fetching 2025-26 standings from ESPN...")
-standings_url = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/standings"
 
-try:
-    response = requests.get(standings_url, timeout=30)
-    if response.status_code == 200:
-        standings_data = response.json()
-        
-        # ESPN standings can be complex - try to extract team records
-        for entry in standings_data.get('children', []):
-            for standing in entry.get('standings', {}).get('entries', []):
-                team_info = standing.get('team', {})
-                team_id = team_info.get('id', '')
-                
-                if team_id in team_id_to_name:
-                    short_name = team_id_to_name[team_id]
-                    stats = standing.get('stats', [])
-                    
-                    # Extract wins/losses from stats
-                    for stat in stats:
-                        if stat.get('name') == 'wins':
-                            espn_records[short_name]['wins'] = int(stat.get('value', 0))
-                        elif stat.get('name') == 'losses':
-                            espn_records[short_name]['losses'] = int(stat.get('value', 0))
-                        elif stat.get('name') == 'gamesPlayed':
-                            espn_records[short_name]['games'] = int(stat.get('value', 0))
-        
-        teams_with_records = sum(1 for r in espn_records.values() if r['games'] > 0)
-        print(f"   ✓ Found records for {teams_with_records} teams")
+def main():
+    parser = argparse.ArgumentParser(description='Validate team records against ESPN')
+    parser.add_argument('--offline', action='store_true',
+                        help=f'Skip ESPN requests and use the snapshot in {ESPN_SNAPSHOT_PATH}')
+    args = parser.parse_args()
+    
+    print("="*80)
+    print("VALIDATING TEAM RECORDS AGAINST ESPN")
+    print("="*80)
+    print()
+    
+    if args.offline:
+        print("1. Loading ESPN records from snapshot (--offline)...")
+        espn_records = load_espn_snapshot()
+        if espn_records is None:
+            print(f"   ❌ No snapshot found at {ESPN_SNAPSHOT_PATH}")
+            sys.exit(1)
+        print(f"   ✓ Loaded {len(espn_records)} teams")
     else:
-        print(f"   ⚠️  Could not fetch standings (status {response.status_code})")
-        print("   Will compare game counts only")
+        # The two ESPN requests are independent - issue them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            teams_future = executor.submit(fetch_team_list)
+            standings_future = executor.submit(fetch_standings)
         
-except Exception as e:
-    print(f"   ⚠️  Error fetching standings: {e}")
-    print("   Will compare game counts only")
-
-# Step 3: Get our database records
-print("\n3. Querying database for team records...")
-db = get_db_connection()
-
-db_query = """
-    SELECT 
-        team_name,
-        SUM(games) as games_played,
-        SUM(wins) as wins,
-        SUM(losses) as losses
-    FROM (
-        SELECT 
-            home_team_canonical as team_name,
-            COUNT(*) as games,
-            SUM(CASE WHEN home_score > away_score THEN 1 ELSE 0 END) as wins,
-            SUM(CASE WHEN home_score < away_score THEN 1 ELSE 0 END) as losses
-        FROM games 
-        WHERE season = '2025-26' AND game_status = 'Final'
-        GROUP BY home_team_canonical
+        # Step 1: Get ESPN teams with their records
+        print("1. Fetching team records from ESPN...")
         
-        UNION ALL
+        try:
+            # Copy so the memoized team list is never mutated
+            espn_records = {team_id: dict(record) for team_id, record in teams_future.result().items()}
+            print(f"   ✓ Found {len(espn_records)} teams")
+            fetched_live = True
+        except Exception as e:
+            print(f"   ❌ Error fetching from ESPN: {e}")
+            espn_records = load_espn_snapshot()
+            if espn_records is None:
+                sys.exit(1)
+            print(f"   ⚠️  Falling back to snapshot in {ESPN_SNAPSHOT_PATH} ({len(espn_records)} teams)")
+            fetched_live = False
         
+        if fetched_live:
+            # Step 2: Fetch current standings from ESPN
+            print("\n2. Fetching 2025-26 standings from ESPN...")
+            
+            try:
+                for team_id, record in standings_future.result().items():
+                    if team_id in espn_records:
+                        espn_records[team_id].update(record)
+                
+                teams_with_records = sum(1 for r in espn_records.values() if r['games'] > 0)
+                print(f"   ✓ Found records for {teams_with_records} teams")
+                save_espn_snapshot(espn_records)
+            except Exception as e:
+                print(f"   ⚠️  Error fetching standings: {e}")
+                print("   Will compare game counts only")
+    
+    # Step 3: Get our database records
+    print("\n3. Querying database for team records...")
+    db = get_db_connection()
+    db.analyze()
+
+    db_query = """
         SELECT 
-            away_team_canonical as team_name,
-            COUNT(*) as games,
-            SUM(CASE WHEN away_score > home_score THEN 1 ELSE 0 END) as wins,
-            SUM(CASE WHEN away_score < home_score THEN 1 ELSE 0 END) as losses
-        FROM games 
+            t.team as team_name,
+            COUNT(*) as games_played,
+            SUM(CASE WHEN t.won THEN 1 ELSE 0 END) as wins,
+            SUM(CASE WHEN t.lost THEN 1 ELSE 0 END) as losses
+        -- Each side carries its own result, so self-play rows count as one game per side
+        FROM games, UNNEST([
+            {'team': home_team_canonical, 'won': home_score > away_score, 'lost': home_score < away_score},
+            {'team': away_team_canonical, 'won': away_score > home_score, 'lost': away_score < home_score}
+        ]) AS u(t)
         WHERE season = '2025-26' AND game_status = 'Final'
-        GROUP BY away_team_canonical
-    )
-    GROUP BY team_name
-    ORDER BY team_name
-"""
+        GROUP BY t.team
+        ORDER BY team_name
+    """
+
+    db_records = db.fetch_all(db_query)
+    print(f"   ✓ Found {len(db_records)} teams in database")
 
-db_records = db.fetch_all(db_query)
-print(f"   ✓ Found {len(db_records)} teams in database")
+    # Step 4: Compare records
+    print("\n4. Comparing records...")
 
-# Step 4: Compare records
-print("\n4. Comparing records...")
+    # Name -> ESPN record, restricted to teams that actually appear in the DB
+    db_team_names = {r['team_name'] for r in db_records}
+    espn_view = {r['name']: r for r in espn_records.values() if r['name'] in db_team_names}
 
-mismatches = []
-missing_from_espn = []
-extra_games = []
+    # Q-gram index over ESPN names, used to suggest fixes for DB names ESPN lacks
+    qgram_index, espn_name_grams = build_qgram_index({r['name'] for r in espn_records.values()})
 
-for db_team in db_records:
-    team_name = db_team['team_name']
-    db_wins = db_team['wins']
-    db_losses = db_team['losses']
-    db_games = db_team['games_played']
+    mismatches = []
+    missing_from_espn = []
+    extra_games = []
+
+    for db_team in db_records:
+        team_name = db_team['team_name']
+        db_wins = db_team['wins']
+        db_losses = db_team['losses']
+        db_games = db_team['games_played']
     
-    if team_name in espn_records:
-        espn_team = espn_records[team_name]
-        espn_wins = espn_team['wins']
-        espn_losses = espn_team['losses']
-        espn_games = espn_team['games']
+        if team_name in espn_view:
+            espn_team = espn_view[team_name]
+            espn_wins = espn_team['wins']
+            espn_losses = espn_team['losses']
+            espn_games = espn_team['games']
         
-        # Only compare if ESPN has data
-        if espn_games > 0:
-            if db_wins != espn_wins or db_losses != espn_losses or db_games != espn_games:
-                mismatches.append({
+            # Only compare if ESPN has data
+            if espn_games > 0:
+                if db_wins != espn_wins or db_losses != espn_losses or db_games != espn_games:
+                    mismatches.append({
+                        'team': team_name,
+                        'db_record': f"{db_wins}-{db_losses} ({db_games} games)",
+                        'espn_record': f"{espn_wins}-{espn_losses} ({espn_games} games)",
+                        'difference': abs(db_games - espn_games)
+                    })
+        else:
+            # Team in our DB but not in ESPN (likely non-D1)
+            if db_games > 5:  # Only care about teams with significant games
+                missing_from_espn.append({
                     'team': team_name,
-                    'db_record': f"{db_wins}-{db_losses} ({db_games} games)",
-                    'espn_record': f"{espn_wins}-{espn_losses} ({espn_games} games)",
-                    'difference': abs(db_games - espn_games)
+                    'games': db_games,
+                    'record': f"{db_wins}-{db_losses}",
+                    'suggestions': suggest_names(team_name, qgram_index, espn_name_grams)
                 })
-    else:
-        # Team in our DB but not in ESPN (likely non-D1)
-        if db_games > 5:  # Only care about teams with significant games
-            missing_from_espn.append({
-                'team': team_name,
-                'games': db_games,
-                'record': f"{db_wins}-{db_losses}"
-            })
-
-print(f"   ✓ Comparison complete")
-
-# Step 5: Report results
-print("\n" + "="*80)
-print("VALIDATION RESULTS")
-print("="*80)
-
-if mismatches:
-    print(f"\n⚠️  RECORD MISMATCHES ({len(mismatches)} teams):")
+
+    print(f"   ✓ Comparison complete")
+
+    # Step 5: Report results
+    print("\n" + "="*80)
+    print("VALIDATION RESULTS")
     print("="*80)
+
+    if mismatches:
+        print(f"\n⚠️  RECORD MISMATCHES ({len(mismatches)} teams):")
+        print("="*80)
     
-    # Sort by difference (biggest issues first)
-    mismatches.sort(key=lambda x: x['difference'], reverse=True)
+        # Biggest issues first (only the top 20 are shown, so skip a full sort)
+        worst_mismatches = heapq.nlargest(20, mismatches, key=lambda x: x['difference'])
     
-    for m in mismatches[:20]:  # Show top 20
-        print(f"\n  {m['team']}:")
-        print(f"    Database: {m['db_record']}")
-        print(f"    ESPN:     {m['espn_record']}")
-        print(f"    Diff:     {m['difference']} game(s)")
+        for m in worst_mismatches:  # Show top 20
+            print(f"\n  {m['team']}:")
+            print(f"    Database: {m['db_record']}")
+            print(f"    ESPN:     {m['espn_record']}")
+            print(f"    Diff:     {m['difference']} game(s)")
     
-    if len(mismatches) > 20:
-        print(f"\n  ... and {len(mismatches) - 20} more")
-else:
-    print("\n✅ NO MISMATCHES FOUND!")
-    print("   All team records match ESPN")
-
-if missing_from_espn:
-    print(f"\n\nℹ️  TEAMS IN DATABASE BUT NOT ESPN D1 ({len(missing_from_espn)} teams):")
-    print("="*80)
-    print("   These are likely D2/D3/NAIA teams:")
-    
-    missing_from_espn.sort(key=lambda x: x['games'], reverse=True)
+        if len(mismatches) > 20:
+            print(f"\n  ... and {len(mismatches) - 20} more")
+    else:
+        print("\n✅ NO MISMATCHES FOUND!")
+        print("   All team records match ESPN")
+
+    if missing_from_espn:
+        print(f"\n\nℹ️  TEAMS IN DATABASE BUT NOT ESPN D1 ({len(missing_from_espn)} teams):")
+        print("="*80)
+        print("   These are likely D2/D3/NAIA teams:")
     
-    for m in missing_from_espn[:15]:
-        print(f"   {m['team']:<40} {m['record']:<15} ({m['games']} games)")
+        for m in heapq.nlargest(15, missing_from_espn, key=lambda x: x['games']):
+            print(f"   {m['team']:<40} {m['record']:<15} ({m['games']} games)")
+            if m['suggestions']:
+                print(f"      closest ESPN names: {', '.join(m['suggestions'])}")
     
-    if len(missing_from_espn) > 15:
-        print(f"   ... and {len(missing_from_espn) - 15} more")
+        if len(missing_from_espn) > 15:
+            print(f"   ... and {len(missing_from_espn) - 15} more")
 
-# Step 6: Detailed mismatch investigation
-if mismatches:
-    print("\n\n" + "="*80)
-    print("DETAILED INVESTIGATION OF TOP MISMATCHES")
-    print("="*80)
+    # Step 6: Detailed mismatch investigation
+    if mismatches:
+        print("\n\n" + "="*80)
+        print("DETAILED INVESTIGATION OF TOP MISMATCHES")
+        print("="*80)
     
-    for m in mismatches[:5]:  # Investigate top 5
-        team_name = m['team']
-        print(f"\n📊 {team_name}:")
+        top_mismatches = worst_mismatches[:5]  # Investigate top 5
+        top_teams = tuple(m['team'] for m in top_mismatches)
+        placeholders = ', '.join('?' * len(top_teams))
+    
+        # Get all games for these teams in one query (one branch per side so
+        # each can use its own season/status/team index instead of an OR scan)
+        top_games = db.fetch_all(f"""
+            SELECT 
+                home_team_canonical AS team_name,
+                game_id,
+                date,
+                home_team,
+                away_team,
+                home_team_canonical,
+                away_team_canonical,
+                home_score,
+                away_score
+            FROM games
+            WHERE season = '2025-26' 
+              AND game_status = 'Final'
+              AND home_team_canonical IN ({placeholders})
+        
+            UNION ALL
         
-        # Get all games for this team
-        games = db.fetch_all("""
             SELECT 
+                away_team_canonical AS team_name,
                 game_id,
                 date,
                 home_team,
@@ -231,60 +365,76 @@ if mismatches:
             FROM games
             WHERE season = '2025-26' 
               AND game_status = 'Final'
-              AND (home_team_canonical = ? OR away_team_canonical = ?)
+              AND away_team_canonical IN ({placeholders})
+              AND home_team_canonical IS DISTINCT FROM away_team_canonical
+        
             ORDER BY date
-        """, (team_name, team_name))
+        """, top_teams * 2)
+    
+        games_by_team = defaultdict(list)
+        for game in top_games:
+            games_by_team[game['team_name']].append(game)
+    
+        for m in top_mismatches:
+            team_name = m['team']
+            print(f"\n📊 {team_name}:")
         
-        print(f"   Games found: {len(games)}")
-        print(f"   Original team names used:")
+            games = games_by_team[team_name]
         
-        # Check for name variations
-        original_names = set()
-        for game in games:
-            if game['home_team_canonical'] == team_name:
-                original_names.add(game['home_team'])
-            if game['away_team_canonical'] == team_name:
-                original_names.add(game['away_team'])
+            print(f"   Games found: {len(games)}")
+            print(f"   Original team names used:")
         
-        for name in sorted(original_names):
-            count = sum(1 for g in games if g['home_team'] == name or g['away_team'] == name)
-            print(f"      - '{name}' ({count} games)")
-
-# Save detailed report
-print("\n\n" + "="*80)
-print("SAVING DETAILED REPORT")
-print("="*80)
-
-report_lines = []
-report_lines.append("TEAM RECORD VALIDATION REPORT")
-report_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-report_lines.append("="*80)
-report_lines.append("")
-
-if mismatches:
-    report_lines.append(f"MISMATCHES FOUND: {len(mismatches)}")
-    report_lines.append("")
-    for m in mismatches:
-        report_lines.append(f"{m['team']}")
-        report_lines.append(f"  Database: {m['db_record']}")
-        report_lines.append(f"  ESPN:     {m['espn_record']}")
-        report_lines.append("")
-else:
-    report_lines.append("✅ NO MISMATCHES - All records match!")
-
-with open('data/team_validation_report.txt', 'w') as f:
-    f.write('\n'.join(report_lines))
-
-print("   ✓ Saved to data/team_validation_report.txt")
-
-print("\n" + "="*80)
-print("VALIDATION COMPLETE")
-print("="*80)
-
-if mismatches:
-    print(f"\n⚠️  Found {len(mismatches)} teams with record mismatches")
-    print("   Review the report and check for incorrect team name mappings")
-else:
-    print("\n✅ All team records validated successfully!")
-
-db.close()
+            # Check for name variations
+            original_names = Counter()
+            for game in games:
+                if game['home_team_canonical'] == team_name:
+                    original_names[game['home_team']] += 1
+                if game['away_team_canonical'] == team_name:
+                    original_names[game['away_team']] += 1
+        
+            for name, count in sorted(original_names.items()):
+                print(f"      - '{name}' ({count} games)")
+
+    # Save detailed report
+    print("\n\n" + "="*80)
+    print("SAVING DETAILED REPORT")
+    print("="*80)
+
+    with open('data/team_validation_report.txt', 'w', buffering=1 << 16) as f:
+        f.write("TEAM RECORD VALIDATION REPORT\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("="*80 + "\n")
+        f.write("\n")
+    
+        if mismatches:
+            f.write(f"MISMATCHES FOUND: {len(mismatches)}\n")
+            f.write("\n")
+            for m in sorted(mismatches, key=lambda x: x['difference'], reverse=True):
+                f.write(f"{m['team']}\n  Database: {m['db_record']}\n  ESPN:     {m['espn_record']}\n\n")
+        else:
+            f.write("✅ NO MISMATCHES - All records match!\n")
+    
+        if missing_from_espn:
+            f.write(f"\nTEAMS NOT FOUND IN ESPN: {len(missing_from_espn)}\n")
+            f.write("\n")
+            for m in sorted(missing_from_espn, key=lambda x: x['games'], reverse=True):
+                suggestions = ', '.join(m['suggestions']) or '-'
+                f.write(f"{m['team']} ({m['games']} games)\n  Closest ESPN names: {suggestions}\n\n")
+
+    print("   ✓ Saved to data/team_validation_report.txt")
+
+    print("\n" + "="*80)
+    print("VALIDATION COMPLETE")
+    print("="*80)
+
+    if mismatches:
+        print(f"\n⚠️  Found {len(mismatches)} teams with record mismatches")
+        print("   Review the report and check for incorrect team name mappings")
+    else:
+        print("\n✅ All team records validated successfully!")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,90 @@
 import sys, os
-# Ensure project root is on path for package imports
+from pathlib import Path
+import pandas as pd
+import pytest  # type: ignore[import-not-found]
+
+# Ensure the project root (packages) and the flat script directories are on path
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
+for path in (os.path.join(ROOT, 'game_prediction'), os.path.join(ROOT, 'scripts'), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Headless plotting for any test that imports matplotlib
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def read_csv_cached(csv_path):
+    """Read a data CSV through a Parquet sidecar that is rebuilt when stale.
+
+    Without pyarrow this is a plain pd.read_csv.
+    """
+    if not HAS_PYARROW:
+        return pd.read_csv(csv_path)
+    csv_path = Path(csv_path)
+    parquet_path = csv_path.with_suffix('.parquet')
+    if not parquet_path.exists() or parquet_path.stat().st_mtime < csv_path.stat().st_mtime:
+        # Write aside and swap in so parallel workers never read a partial file
+        tmp_path = parquet_path.with_name(f'{parquet_path.name}.{os.getpid()}.tmp')
+        pd.read_csv(csv_path).to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+    return pd.read_parquet(parquet_path, engine='pyarrow')
+
+
+# Read-only CSV datasets and fitted models are built once per test session
+@pytest.fixture(scope="session")
+def completed_games():
+    return read_csv_cached('data/Completed_Games.csv')
+
+
+@pytest.fixture(scope="session")
+def upcoming_games():
+    return read_csv_cached('data/Upcoming_Games.csv')
+
+
+@pytest.fixture(scope="session")
+def adaptive_predictor_fit(completed_games):
+    from model_training.adaptive_predictor import AdaptivePredictor
+    predictor = AdaptivePredictor()
+    predictor.fit(completed_games)
+    return predictor
+
+
+@pytest.fixture(scope="session")
+def cached_feature_store():
+    """build_feature_store memoized on the content of the games frame."""
+    from model_training.feature_store import build_feature_store
+    cache = {}
+
+    def build(games_df):
+        key = (tuple(games_df.columns), pd.util.hash_pandas_object(games_df).values.tobytes())
+        if key not in cache:
+            cache[key] = build_feature_store(games_df)
+        return cache[key]
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def matplotlib_warm():
+    """Import pyplot and build the font cache once, before tests that plot."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+    font_manager.findfont('DejaVu Sans')
+    plt.close(plt.figure())
+    return plt
+
+
+@pytest.fixture(scope="session")
+def normalize_name():
+    """Memoized data_collection.team_name_utils.normalize_team_name."""
+    from functools import lru_cache
+    from data_collection.team_name_utils import normalize_team_name
+    return lru_cache(maxsize=4096)(normalize_team_name)
@@ -1,9 +1,11 @@
 import pandas as pd
+import pytest
 from model_training.adaptive_predictor import AdaptivePredictor  # type: ignore
 
 
-def test_adaptive_predictor_end_to_end():
-    train_df = pd.DataFrame([
+@pytest.fixture(scope="module")
+def train_df():
+    return pd.DataFrame([
         {
             'game_id': 'G1', 'home_team': 'TeamA', 'away_team': 'TeamB',
             'home_score': 70, 'away_score': 65, 'home_team_id': 1, 'away_team_id': 2,
@@ -15,7 +17,11 @@ def test_adaptive_predictor_end_to_end():
             'home_win': 0
         }
     ])
-    upcoming_df = pd.DataFrame([
+
+
+@pytest.fixture(scope="module")
+def upcoming_df():
+    return pd.DataFrame([
         {
             'game_id': 'G3', 'home_team': 'TeamA', 'away_team': 'TeamC',
             'home_team_id': 1, 'away_team_id': 3, 'date': '2025-11-06', 'game_url': 'http://example.com/G3'
@@ -25,9 +31,22 @@ def test_adaptive_predictor_end_to_end():
             'home_team_id': 2, 'away_team_id': 3, 'date': '2025-11-06', 'game_url': 'http://example.com/G4'
         }
     ])
-    predictor = AdaptivePredictor(min_games_threshold=0, calibrate=False)  # type: ignore[arg-type]
+
+
+# Fit once per module; smoke tests only differ in what they predict on
+@pytest.fixture(scope="module")
+def fitted_predictor(train_df, tmp_path_factory):
+    importance_path = tmp_path_factory.mktemp("adaptive") / "Adaptive_Feature_Importance.csv"
+    predictor = AdaptivePredictor(
+        min_games_threshold=0, calibrate=False,  # type: ignore[arg-type]
+        feature_importance_path=str(importance_path),
+    )
     predictor.fit(train_df)
-    preds = predictor.predict(upcoming_df)
+    return predictor
+
+
+def test_adaptive_predictor_end_to_end(fitted_predictor, upcoming_df):
+    preds = fitted_predictor.predict(upcoming_df)
     assert len(preds) == len(upcoming_df)
     assert 'predicted_winner' in preds.columns
     assert 'confidence' in preds.columns
@@ -28,6 +28,7 @@ def test_is_bettable_moneyline():
     assert is_bettable_moneyline(-1001) is False
     assert is_bettable_moneyline(-3000) is False
     assert is_bettable_moneyline(-100000) is False
+    assert is_bettable_moneyline(0) is False  # not a valid American price
 
     # Invalid inputs
     assert is_bettable_moneyline(None) is False
@@ -49,6 +50,7 @@ def test_calculate_value_score():
 
     # Unbettable moneyline should return None
     assert calculate_value_score(0.85, -3000) is None
+    assert calculate_value_score(0.85, 0) is None
 
     # Invalid inputs should return None
     assert calculate_value_score(None, -110) is None
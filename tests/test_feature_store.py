@@ -1,5 +1,4 @@
 import pandas as pd
-from model_training.feature_store import build_feature_store
 from model_training.team_id_utils import ensure_team_ids
 
 
@@ -15,9 +14,9 @@ def _sample_games():
     return pd.DataFrame(data)
 
 
-def test_feature_store_basic_rolling():
+def test_feature_store_basic_rolling(cached_feature_store):
     games = ensure_team_ids(_sample_games())
-    fs = build_feature_store(games)
+    fs = cached_feature_store(games)
     # Expect one row per team in season
     assert set(fs['team_id'])  # non-empty
     # Games played should reflect number of appearances per team
@@ -26,9 +25,9 @@ def test_feature_store_basic_rolling():
     assert 'games_played' in fs.columns
 
 
-def test_feature_store_incremental_update():
+def test_feature_store_incremental_update(cached_feature_store):
     games = ensure_team_ids(_sample_games())
-    fs1 = build_feature_store(games.iloc[:3])
-    fs2 = build_feature_store(games)  # full set should override same season+team rows
+    fs1 = cached_feature_store(games.iloc[:3])
+    fs2 = cached_feature_store(games)  # full set should override same season+team rows
     # Full set should have >= rows (additional teams may appear in later slice)
     assert len(fs2) >= len(fs1)
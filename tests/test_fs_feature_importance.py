@@ -8,8 +8,8 @@ def test_extract_fs_feature_importance_ordering():
     mapping = extract_fs_feature_importance(features, importances)
     # Expect descending order by importance
     keys = list(mapping.keys())
-    values = list(mapping.values())
-    assert values == sorted(values, reverse=True)
+    values = np.fromiter(mapping.values(), dtype=np.float64, count=len(mapping))
+    assert np.all(np.diff(values) <= 0)
     assert keys[0] == 'fs_point_diff10_diff'
     assert 'fs_win_pct5_diff' in mapping
     assert 'fs_win_pct10_diff' in mapping
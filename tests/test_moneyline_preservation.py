@@ -2,11 +2,20 @@
 Tests for moneyline preservation in predictions.
 Ensures that betting-related columns from upcoming games are preserved in predictions.
 """
+import copy
+
 import pandas as pd
+import pytest  # type: ignore[import-not-found]
 from model_training.adaptive_predictor import AdaptivePredictor  # type: ignore
 
 
-def test_moneyline_columns_preserved():
+@pytest.fixture(scope="module")
+def adaptive_template():
+    """Unfitted predictor; each test fits its own deep copy."""
+    return AdaptivePredictor(min_games_threshold=0, calibrate=False)  # type: ignore[arg-type]
+
+
+def test_moneyline_columns_preserved(adaptive_template):
     """Test that moneyline columns are preserved when generating predictions."""
     # Create minimal training data
     train_df = pd.DataFrame([
@@ -50,7 +59,7 @@ def test_moneyline_columns_preserved():
     ])
     
     # Generate predictions
-    predictor = AdaptivePredictor(min_games_threshold=0, calibrate=False)  # type: ignore[arg-type]
+    predictor = copy.deepcopy(adaptive_template)
     predictor.fit(train_df)
     predictions = predictor.predict(upcoming_df)
     
@@ -81,7 +90,7 @@ def test_moneyline_columns_preserved():
     assert game3['has_real_odds'] == False, "has_real_odds value mismatch for U3"
 
 
-def test_predictions_without_moneylines():
+def test_predictions_without_moneylines(adaptive_template):
     """Test that predictions work even when moneyline columns are missing."""
     # Create minimal training data with both wins and losses
     train_df = pd.DataFrame([
@@ -107,7 +116,7 @@ def test_predictions_without_moneylines():
     ])
     
     # Generate predictions
-    predictor = AdaptivePredictor(min_games_threshold=0, calibrate=False)  # type: ignore[arg-type]
+    predictor = copy.deepcopy(adaptive_template)
     predictor.fit(train_df)
     predictions = predictor.predict(upcoming_df)
     
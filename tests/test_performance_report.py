@@ -1,34 +1,36 @@
 """Test performance report generation."""
 
-import tempfile
-from pathlib import Path
+import numpy as np
 import pandas as pd
 import pytest
-import sys
-import os
 
-# Add scripts directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
+@pytest.fixture(scope="module")
+def sample_accuracy_df():
+    """Ten days of accuracy-report rows (read-only; copy before mutating)."""
+    return pd.DataFrame({
+        'date': pd.date_range('2025-11-10', periods=10),
+        'total_predictions': np.full(10, 20, dtype=np.int16),
+        'games_completed': np.full(10, 20, dtype=np.int16),
+        'correct_predictions': np.array([16, 17, 18, 15, 16, 17, 16, 18, 17, 16], dtype=np.int16),
+        'accuracy': np.array([0.8, 0.85, 0.9, 0.75, 0.8, 0.85, 0.8, 0.9, 0.85, 0.8], dtype=np.float32),
+        'avg_confidence': np.full(10, 0.85, dtype=np.float32),
+    })
+
+
+@pytest.fixture(scope="module")
+def accuracy_csv_bytes(sample_accuracy_df):
+    """Accuracy_Report.csv payload for the sample frame, serialized once."""
+    return sample_accuracy_df.assign(config_version='test', commit_hash='abc123').to_csv(index=False).encode()
 
-def test_performance_report_with_sample_data():
+
+def test_performance_report_with_sample_data(sample_accuracy_df):
     """Test that performance report can be generated with sample data."""
     from generate_performance_report import main, _derive_accuracy_features, _drift_snapshot
     import generate_performance_report as gpr
     
-    # Create sample accuracy data
-    sample_data = {
-        'date': pd.date_range('2025-11-10', periods=10),
-        'total_predictions': [20] * 10,
-        'games_completed': [20] * 10,
-        'correct_predictions': [16, 17, 18, 15, 16, 17, 16, 18, 17, 16],
-        'accuracy': [0.8, 0.85, 0.9, 0.75, 0.8, 0.85, 0.8, 0.9, 0.85, 0.8],
-        'avg_confidence': [0.85] * 10,
-    }
-    df = pd.DataFrame(sample_data)
-    
-    # Test _derive_accuracy_features
-    result_df = _derive_accuracy_features(df)
+    # Test _derive_accuracy_features (works on its own copy)
+    result_df = _derive_accuracy_features(sample_accuracy_df)
     assert 'rolling_accuracy' in result_df.columns
     assert len(result_df) == 10
     
@@ -50,88 +52,61 @@ def test_performance_report_with_sample_data():
     assert "100 games" in drift_msg
     
 
-def test_performance_report_generation_end_to_end():
+def test_performance_report_generation_end_to_end(monkeypatch, tmp_path, matplotlib_warm, accuracy_csv_bytes):
     """Test full performance report generation with temporary files."""
     from generate_performance_report import main
     import generate_performance_report as gpr
     
-    # Save original paths
-    orig_accuracy = gpr.ACCURACY_CSV
-    orig_drift = gpr.DRIFT_CSV
-    orig_report = gpr.REPORT_PATH
-    orig_asset_dir = gpr.ASSET_DIR
-    orig_repo_root = gpr.REPO_ROOT
+    # Create temporary directories
+    data_dir = tmp_path / "data"
+    docs_dir = tmp_path / "docs"
+    asset_dir = docs_dir / "performance"
+    data_dir.mkdir()
+    docs_dir.mkdir()
+    asset_dir.mkdir(parents=True)
+    
+    # Create sample accuracy CSV
+    accuracy_csv = data_dir / "Accuracy_Report.csv"
+    accuracy_csv.write_bytes(accuracy_csv_bytes)
+    
+    # Create empty drift CSV
+    drift_csv = data_dir / "Drift_Metrics.csv"
+    drift_csv.write_text("date,season,games_seen,cumulative_accuracy,cumulative_logloss,cumulative_brier\n")
+    
+    report_path = tmp_path / "performance.md"
+    
+    # Override paths (restored automatically after the test)
+    monkeypatch.setattr(gpr, "ACCURACY_CSV", accuracy_csv)
+    monkeypatch.setattr(gpr, "DRIFT_CSV", drift_csv)
+    monkeypatch.setattr(gpr, "REPORT_PATH", report_path)
+    monkeypatch.setattr(gpr, "ASSET_DIR", asset_dir)
+    monkeypatch.setattr(gpr, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(matplotlib_warm, "show", lambda *a, **k: None)
+    
+    # Run main
+    main()
+    
+    # Verify report was created
+    assert report_path.exists()
+    content = report_path.read_text()
+    
+    # Check for key sections
+    assert "# 📊 Model Performance Dashboard" in content
+    assert "## Overview" in content
+    assert "Overall Accuracy" in content
+    assert "7-Day Rolling Accuracy" in content
+    assert "## Daily Accuracy" in content
+    assert "## Average Confidence" in content
+    assert "### Recent History" in content
+    assert "## Drift Snapshot" in content
+    assert "## Performance Trends" in content
+    assert "Last 7 Days" in content
+    assert "Back to Main README" in content
+    assert "View Latest Predictions" in content
     
-    try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            
-            # Create temporary directories
-            data_dir = tmppath / "data"
-            docs_dir = tmppath / "docs"
-            asset_dir = docs_dir / "performance"
-            data_dir.mkdir()
-            docs_dir.mkdir()
-            asset_dir.mkdir(parents=True)
-            
-            # Create sample accuracy CSV
-            accuracy_csv = data_dir / "Accuracy_Report.csv"
-            sample_data = {
-                'date': pd.date_range('2025-11-10', periods=10),
-                'total_predictions': [20] * 10,
-                'games_completed': [20] * 10,
-                'correct_predictions': [16, 17, 18, 15, 16, 17, 16, 18, 17, 16],
-                'accuracy': [0.8, 0.85, 0.9, 0.75, 0.8, 0.85, 0.8, 0.9, 0.85, 0.8],
-                'avg_confidence': [0.85] * 10,
-                'config_version': ['test'] * 10,
-                'commit_hash': ['abc123'] * 10,
-            }
-            pd.DataFrame(sample_data).to_csv(accuracy_csv, index=False)
-            
-            # Create empty drift CSV
-            drift_csv = data_dir / "Drift_Metrics.csv"
-            drift_csv.write_text("date,season,games_seen,cumulative_accuracy,cumulative_logloss,cumulative_brier\n")
-            
-            report_path = tmppath / "performance.md"
-            
-            # Override paths
-            gpr.ACCURACY_CSV = accuracy_csv
-            gpr.DRIFT_CSV = drift_csv
-            gpr.REPORT_PATH = report_path
-            gpr.ASSET_DIR = asset_dir
-            gpr.REPO_ROOT = tmppath
-            
-            # Run main
-            main()
-            
-            # Verify report was created
-            assert report_path.exists()
-            content = report_path.read_text()
-            
-            # Check for key sections
-            assert "# 📊 Model Performance Dashboard" in content
-            assert "## Overview" in content
-            assert "Overall Accuracy" in content
-            assert "7-Day Rolling Accuracy" in content
-            assert "## Daily Accuracy" in content
-            assert "## Average Confidence" in content
-            assert "### Recent History" in content
-            assert "## Drift Snapshot" in content
-            assert "## Performance Trends" in content
-            assert "Last 7 Days" in content
-            assert "Back to Main README" in content
-            assert "View Latest Predictions" in content
-            
-            # Verify charts were created
-            assert (asset_dir / "daily_accuracy.png").exists()
-            assert (asset_dir / "average_confidence.png").exists()
-    finally:
-        # Restore original paths
-        gpr.ACCURACY_CSV = orig_accuracy
-        gpr.DRIFT_CSV = orig_drift
-        gpr.REPORT_PATH = orig_report
-        gpr.ASSET_DIR = orig_asset_dir
-        gpr.REPO_ROOT = orig_repo_root
+    # Verify charts were created
+    assert (asset_dir / "daily_accuracy.png").exists()
+    assert (asset_dir / "average_confidence.png").exists()
 
 
 if __name__ == "__main__":
@@ -8,16 +8,62 @@ Tests cover:
 - Task 1.4: Early season detection
 """
 
+import functools
+import json
 import pytest
 import pandas as pd
 import numpy as np
+from sklearn.preprocessing import LabelEncoder
 from datetime import datetime, timedelta
 from pathlib import Path
-import sys
-import os
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_training.adaptive_predictor import AdaptivePredictor
+from model_training.feature_store import (
+    LEAGUE_AVERAGE_DEFAULTS,
+    NUMERIC_FEATURE_COLS,
+    _get_prior_season,
+    enrich_dataframe_with_fallback,
+    get_team_features_with_fallback,
+)
+
+_HOME_FS_COLS = tuple(f'home_fs_{col}' for col in NUMERIC_FEATURE_COLS)
+_AWAY_FS_COLS = tuple(f'away_fs_{col}' for col in NUMERIC_FEATURE_COLS)
+
+FEATURE_FLAGS_PATH = Path('config/feature_flags.json')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_flags():
+    """Parse the feature flags config once per test session."""
+    return json.loads(FEATURE_FLAGS_PATH.read_text())
+
+
+@pytest.fixture(scope="class")
+def predictor():
+    """One AdaptivePredictor per test class; tests only toggle the flags they need."""
+    return AdaptivePredictor()
+
+
+FS_TEST_COLUMNS = {
+    'season': 'object',
+    'games_played': 'int64',
+    'rolling_win_pct_5': 'float64',
+    'rolling_win_pct_10': 'float64',
+    'rolling_point_diff_avg_5': 'float64',
+    'rolling_point_diff_avg_10': 'float64',
+    'win_pct_last5_vs10': 'float64',
+    'point_diff_last5_vs10': 'float64',
+    'recent_strength_index_5': 'float64',
+}
+
+
+def _fs_frame(*rows):
+    """Build a column-oriented feature store frame for 'test_team' from row tuples."""
+    if not rows:
+        return pd.DataFrame()
+    columns = {'team_id': ['test_team'] * len(rows)}
+    columns.update(zip(FS_TEST_COLUMNS, map(list, zip(*rows))))
+    return pd.DataFrame(columns).astype(FS_TEST_COLUMNS)
 
 
 class TestFeatureStoreFallback:
@@ -25,8 +71,6 @@ class TestFeatureStoreFallback:
     
     def test_league_average_defaults(self):
         """Test that league average defaults are sensible."""
-        from model_training.feature_store import LEAGUE_AVERAGE_DEFAULTS
-        
         # Win percentage should be 0.5 (neutral)
         assert LEAGUE_AVERAGE_DEFAULTS['rolling_win_pct_5'] == 0.5
         assert LEAGUE_AVERAGE_DEFAULTS['rolling_win_pct_10'] == 0.5
@@ -37,95 +81,47 @@ class TestFeatureStoreFallback:
     
     def test_get_prior_season(self):
         """Test prior season calculation."""
-        from model_training.feature_store import _get_prior_season
-        
         assert _get_prior_season('2024-25') == '2023-24'
         assert _get_prior_season('2023-24') == '2022-23'
         assert _get_prior_season('2025') == '2024'
     
-    def test_get_team_features_empty_store(self):
-        """Test fallback when feature store is empty."""
-        from model_training.feature_store import get_team_features_with_fallback
-        
-        empty_df = pd.DataFrame()
-        result = get_team_features_with_fallback('test_team', '2024-25', empty_df)
-        
-        assert result['is_fallback'] == True
-        assert result['fallback_type'] == 'empty_store'
-        assert result['rolling_win_pct_5'] == 0.5
-    
-    def test_get_team_features_current_season(self):
-        """Test using current season data when available."""
-        from model_training.feature_store import get_team_features_with_fallback
-        
-        fs_df = pd.DataFrame([{
-            'team_id': 'test_team',
-            'season': '2024-25',
-            'games_played': 10,
-            'rolling_win_pct_5': 0.8,
-            'rolling_win_pct_10': 0.7,
-            'rolling_point_diff_avg_5': 5.0,
-            'rolling_point_diff_avg_10': 4.0,
-            'win_pct_last5_vs10': 0.1,
-            'point_diff_last5_vs10': 1.0,
-            'recent_strength_index_5': 4.0
-        }])
-        
-        result = get_team_features_with_fallback('test_team', '2024-25', fs_df, min_games=5)
-        
-        assert result['is_fallback'] == False
-        assert result['rolling_win_pct_5'] == 0.8
-    
-    def test_get_team_features_prior_season_fallback(self):
-        """Test falling back to prior season when current has insufficient games."""
-        from model_training.feature_store import get_team_features_with_fallback
-        
-        fs_df = pd.DataFrame([
-            {
-                'team_id': 'test_team',
-                'season': '2024-25',
-                'games_played': 2,  # Less than min_games
-                'rolling_win_pct_5': np.nan,
-                'rolling_win_pct_10': np.nan,
-                'rolling_point_diff_avg_5': np.nan,
-                'rolling_point_diff_avg_10': np.nan,
-                'win_pct_last5_vs10': np.nan,
-                'point_diff_last5_vs10': np.nan,
-                'recent_strength_index_5': np.nan
-            },
-            {
-                'team_id': 'test_team',
-                'season': '2023-24',
-                'games_played': 30,
-                'rolling_win_pct_5': 0.6,
-                'rolling_win_pct_10': 0.55,
-                'rolling_point_diff_avg_5': 3.0,
-                'rolling_point_diff_avg_10': 2.5,
-                'win_pct_last5_vs10': 0.05,
-                'point_diff_last5_vs10': 0.5,
-                'recent_strength_index_5': 1.8
-            }
-        ])
-        
-        result = get_team_features_with_fallback('test_team', '2024-25', fs_df, min_games=5)
-        
-        assert result['is_fallback'] == True
-        assert result['fallback_type'] == 'prior_season'
-        assert result['rolling_win_pct_5'] == 0.6
+    @pytest.mark.parametrize(
+        "fs_rows, team, season, min_games, expected_fallback, expected_fallback_type, expected_win_pct",
+        [
+            # Empty feature store falls back to league averages
+            ([], 'test_team', '2024-25', 5, True, 'empty_store', 0.5),
+            # Current season data is used when the team has enough games
+            ([('2024-25', 10, 0.8, 0.7, 5.0, 4.0, 0.1, 1.0, 4.0)],
+             'test_team', '2024-25', 5, False, 'none', 0.8),
+            # Prior season is used when current has insufficient games
+            ([('2024-25', 2, *[np.nan] * 7),
+              ('2023-24', 30, 0.6, 0.55, 3.0, 2.5, 0.05, 0.5, 1.8)],
+             'test_team', '2024-25', 5, True, 'prior_season', 0.6),
+        ],
+        ids=['empty_store', 'current_season', 'prior_season_fallback'],
+    )
+    def test_get_team_features(self, fs_rows, team, season, min_games,
+                               expected_fallback, expected_fallback_type, expected_win_pct):
+        """Test each level of the feature store fallback hierarchy."""
+        fs_df = _fs_frame(*fs_rows)
+        
+        result = get_team_features_with_fallback(team, season, fs_df, min_games=min_games)
+        
+        assert result['is_fallback'] == expected_fallback
+        assert result['fallback_type'] == expected_fallback_type
+        assert result['rolling_win_pct_5'] == expected_win_pct
     
     def test_enrich_dataframe_no_nan(self):
         """Test that enriched dataframe has no NaN values."""
-        from model_training.feature_store import enrich_dataframe_with_fallback, NUMERIC_FEATURE_COLS
-        
-        games_df = pd.DataFrame([{
-            'game_id': '123',
-            'home_team': 'Team A',
-            'away_team': 'Team B',
-            'home_team_id': 'team_a_id',
-            'away_team_id': 'team_b_id',
-            'season': '2024-25',
-            'date': '2024-11-15'
-        }])
+        games_df = pd.DataFrame({
+            'game_id': ['123'],
+            'home_team': ['Team A'],
+            'away_team': ['Team B'],
+            'home_team_id': ['team_a_id'],
+            'away_team_id': ['team_b_id'],
+            'season': ['2024-25'],
+            'date': ['2024-11-15'],
+        })
         
         # Empty feature store - should use league averages
         fs_df = pd.DataFrame()
@@ -133,23 +129,23 @@ class TestFeatureStoreFallback:
         result = enrich_dataframe_with_fallback(games_df, fs_df, min_games=5)
         
         # Check no NaN in feature columns
-        for col in NUMERIC_FEATURE_COLS:
-            home_col = f'home_fs_{col}'
-            away_col = f'away_fs_{col}'
-            if home_col in result.columns:
-                assert not result[home_col].isna().any(), f"NaN found in {home_col}"
-            if away_col in result.columns:
-                assert not result[away_col].isna().any(), f"NaN found in {away_col}"
+        cols = [col for col in _HOME_FS_COLS + _AWAY_FS_COLS if col in result.columns]
+        nan_mask = result[cols].isna().to_numpy()
+        assert not nan_mask.any(), f"NaN found in {[c for c, bad in zip(cols, nan_mask.any(axis=0)) if bad]}"
 
 
 class TestSmartTeamEncoding:
     """Tests for Task 1.2: Smart Team Encoding"""
     
-    def test_known_team_encoding(self):
-        """Test that known teams get proper encoding."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
+    @pytest.fixture
+    def predictor(self):
+        """A fresh AdaptivePredictor per test, with the unfitted encoder fit() would create."""
         predictor = AdaptivePredictor()
+        predictor.team_encoder = LabelEncoder()
+        return predictor
+    
+    def test_known_team_encoding(self, predictor):
+        """Test that known teams get proper encoding."""
         predictor.use_smart_encoding = True
         
         # Fit encoder with some teams
@@ -160,11 +156,8 @@ class TestSmartTeamEncoding:
         assert enc >= 0
         assert enc < 3
     
-    def test_unknown_team_not_negative(self):
+    def test_unknown_team_not_negative(self, predictor):
         """Test that unknown teams don't get -1 encoding."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
         predictor.use_smart_encoding = True
         
         # Fit encoder with some teams
@@ -175,15 +168,12 @@ class TestSmartTeamEncoding:
         assert enc >= 0
         assert enc < len(predictor.team_encoder.classes_)
     
-    def test_different_unknown_teams_get_different_encodings(self):
+    def test_different_unknown_teams_get_different_encodings(self, predictor):
         """Test that different unknown teams get slightly different encodings."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
         predictor.use_smart_encoding = True
         
-        # Fit with many teams so there's room for variation
-        teams = [f'Team_{i}' for i in range(100)]
+        # 16 teams puts the median at 8, so the full -5..+4 hash offset fits without clamping
+        teams = [f'Team_{i}' for i in range(16)]
         predictor.team_encoder.fit(teams)
         
         # Different unknown teams should get different (or at least possibly different) encodings
@@ -196,11 +186,8 @@ class TestSmartTeamEncoding:
         # With deterministic hash-based offset, they should differ
         assert len(encodings) >= 2
     
-    def test_smart_encoding_disabled(self):
+    def test_smart_encoding_disabled(self, predictor):
         """Test that disabling smart encoding returns -1."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
         predictor.use_smart_encoding = False
         
         predictor.team_encoder.fit(['Duke', 'Kentucky'])
@@ -212,132 +199,59 @@ class TestSmartTeamEncoding:
 class TestEarlySeasonDetection:
     """Tests for Task 1.4: Early Season Detection"""
     
-    def test_early_season_detection_november(self):
-        """Test early season detection in November."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        
-        # Early November should be early season
-        early_date = datetime(2024, 11, 10)
-        assert predictor._is_early_season(early_date) == True
+    @pytest.mark.parametrize("date, expected", [
+        (datetime(2024, 11, 10), True),   # Early November is early season
+        (datetime(2024, 12, 20), False),  # Late December is not
+        (datetime(2025, 2, 15), False),   # February is definitely not
+        ('2024-11-10', True),             # String dates should also work
+        ('2024-12-20', False),
+    ])
+    def test_is_early_season(self, predictor, date, expected):
+        """Test early season detection for datetime and string dates."""
+        assert predictor._is_early_season(date) == expected
     
-    def test_early_season_detection_december(self):
-        """Test that late December is not early season."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        
-        # Late December should not be early season
-        late_date = datetime(2024, 12, 20)
-        assert predictor._is_early_season(late_date) == False
-    
-    def test_early_season_detection_february(self):
-        """Test that February is definitely not early season."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        
-        feb_date = datetime(2025, 2, 15)
-        assert predictor._is_early_season(feb_date) == False
-    
-    def test_early_season_string_date(self):
-        """Test early season detection with string date."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        
-        # String format should also work
-        assert predictor._is_early_season('2024-11-10') == True
-        assert predictor._is_early_season('2024-12-20') == False
-    
-    def test_confidence_factor_few_games(self):
-        """Test that confidence factor is reduced for teams with few games."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
+    def test_confidence_factor_reduced_early(self, predictor):
+        """Test that teams with few games early in the season get a reduced factor."""
         predictor.use_early_season_adjustment = True
+        date = datetime(2024, 11, 15)
         
-        early_date = datetime(2024, 11, 15)
-        
-        # Teams with few games should get lower factor
-        factor_few = predictor._get_early_season_confidence_factor(early_date, home_games=2, away_games=3)
-        factor_many = predictor._get_early_season_confidence_factor(early_date, home_games=12, away_games=10)
+        factor = predictor._get_early_season_confidence_factor(date, home_games=2, away_games=3)
         
-        assert factor_few < factor_many
-        assert factor_few < 1.0
+        # Teams with few games should get a lower factor than established teams
+        factor_many = predictor._get_early_season_confidence_factor(date, home_games=12, away_games=10)
+        assert factor < factor_many
+        assert factor < 1.0
     
-    def test_confidence_factor_late_season(self):
-        """Test that late season always returns 1.0."""
-        from model_training.adaptive_predictor import AdaptivePredictor
+    @pytest.mark.parametrize("adjustment_enabled, date", [
+        (True, datetime(2025, 2, 15)),    # Late season always returns 1.0
+        (False, datetime(2024, 11, 15)),  # Disabled adjustment returns 1.0
+    ], ids=['late_season', 'disabled'])
+    def test_confidence_factor_neutral(self, predictor, adjustment_enabled, date):
+        """Test that the factor is 1.0 late in the season or when the adjustment is off."""
+        predictor.use_early_season_adjustment = adjustment_enabled
         
-        predictor = AdaptivePredictor()
-        predictor.use_early_season_adjustment = True
+        factor = predictor._get_early_season_confidence_factor(date, home_games=2, away_games=3)
         
-        late_date = datetime(2025, 2, 15)
-        
-        factor = predictor._get_early_season_confidence_factor(late_date, home_games=2, away_games=3)
-        assert factor == 1.0
-    
-    def test_early_season_adjustment_disabled(self):
-        """Test that disabled adjustment always returns 1.0."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        predictor.use_early_season_adjustment = False
-        
-        early_date = datetime(2024, 11, 15)
-        
-        factor = predictor._get_early_season_confidence_factor(early_date, home_games=2, away_games=3)
         assert factor == 1.0
 
 
 class TestTemperatureScaling:
     """Tests for Task 1.3: Temperature Scaling"""
     
-    def test_temperature_reduces_confidence(self):
-        """Test that temperature < 1 reduces confidence."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        predictor.confidence_temperature_value = 0.8
-        
-        # High probability should be reduced
-        probs = np.array([0.9])
-        result = predictor._apply_confidence_temperature(probs)
-        
-        # Should move toward 0.5
-        assert result[0] < 0.9
-        assert result[0] > 0.5
-    
-    def test_temperature_unity_no_change(self):
-        """Test that temperature = 1.0 doesn't change probabilities."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        predictor.confidence_temperature_value = 1.0
-        
-        probs = np.array([0.75])
-        result = predictor._apply_confidence_temperature(probs)
-        
-        assert np.isclose(result[0], 0.75)
-    
-    def test_temperature_preserves_direction(self):
-        """Test that temperature doesn't flip predictions."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor()
-        predictor.confidence_temperature_value = 0.7
-        
-        # Probability > 0.5 should stay > 0.5
-        probs_high = np.array([0.8])
-        result_high = predictor._apply_confidence_temperature(probs_high)
-        assert result_high[0] > 0.5
-        
-        # Probability < 0.5 should stay < 0.5
-        probs_low = np.array([0.3])
-        result_low = predictor._apply_confidence_temperature(probs_low)
-        assert result_low[0] < 0.5
+    @pytest.mark.parametrize("temp, p_in, predicate", [
+        # Temperature < 1 moves high probabilities toward 0.5
+        (0.8, 0.9, lambda p: 0.5 < p < 0.9),
+        # Temperature = 1.0 doesn't change probabilities
+        (1.0, 0.75, lambda p: np.isclose(p, 0.75)),
+        # Temperature doesn't flip predictions on either side of 0.5
+        (0.7, 0.8, lambda p: p > 0.5),
+        (0.7, 0.3, lambda p: p < 0.5),
+    ], ids=['reduces_confidence', 'unity_no_change', 'preserves_high', 'preserves_low'])
+    def test_temperature_behavior(self, predictor, temp, p_in, predicate):
+        """Test temperature scaling invariants."""
+        predictor.confidence_temperature_value = temp
+        result = predictor._apply_confidence_temperature(np.array([p_in]))
+        assert predicate(result[0])
 
 
 class TestFeatureFlagsConfig:
@@ -345,15 +259,11 @@ class TestFeatureFlagsConfig:
     
     def test_feature_flags_file_exists(self):
         """Test that feature flags config file exists."""
-        flags_path = Path('config/feature_flags.json')
-        assert flags_path.exists(), "Feature flags config file should exist"
+        assert FEATURE_FLAGS_PATH.exists(), "Feature flags config file should exist"
     
     def test_feature_flags_has_required_keys(self):
         """Test that feature flags has all required keys."""
-        import json
-        
-        with open('config/feature_flags.json') as f:
-            flags = json.load(f)
+        flags = _load_flags()
         
         required_keys = [
             'use_feature_fallback',
@@ -11,17 +11,19 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from pathlib import Path
-import sys
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from model_training.adaptive_predictor import AdaptivePredictor
+from model_training.home_away_splits import HomeAwaySplits, add_rest_days_features, calculate_rest_days
+from model_training.power_ratings import PowerRatings
+
+# Keep this module's fitted fixtures on one worker under `pytest -n auto --dist loadgroup`
+pytestmark = pytest.mark.xdist_group(name="phase2")
 
 
 class TestPowerRatings:
     """Tests for Phase 2 Task 2.1 - Power Ratings."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_games(self):
         """Create sample game data for testing."""
         return pd.DataFrame({
@@ -36,24 +38,26 @@ class TestPowerRatings:
             'date': [datetime(2024, 11, i+1) for i in range(6)],
         })
     
+    @pytest.fixture(scope="module")
+    def fitted_pr(self, sample_games):
+        """PowerRatings solved once over sample_games and shared by the tests below."""
+        pr = PowerRatings(n_iterations=5)
+        pr.calculate_ratings(sample_games)
+        return pr
+    
     def test_power_ratings_import(self):
         """Test that power ratings module can be imported."""
         from model_training import power_ratings
         assert hasattr(power_ratings, 'PowerRatings')
     
-    def test_power_ratings_calculation(self, sample_games):
+    def test_power_ratings_calculation(self, fitted_pr):
         """Test that power ratings are calculated for all teams."""
-        from model_training.power_ratings import PowerRatings
-        
-        pr = PowerRatings(n_iterations=5)
-        pr.calculate_ratings(sample_games)
-        
         # All teams should have ratings (stored in pr.ratings dict)
-        assert 'Duke' in pr.ratings or 'duke' in pr.ratings
-        assert 'UNC' in pr.ratings or 'unc' in pr.ratings
+        assert 'Duke' in fitted_pr.ratings or 'duke' in fitted_pr.ratings
+        assert 'UNC' in fitted_pr.ratings or 'unc' in fitted_pr.ratings
         
         # Get a team rating using the public method
-        duke_rating = pr.get_team_rating('Duke')
+        duke_rating = fitted_pr.get_team_rating('Duke')
         
         # Each rating should have expected keys
         assert 'overall' in duke_rating or 'net_rating' in duke_rating
@@ -61,26 +65,16 @@ class TestPowerRatings:
         assert 'defensive' in duke_rating or 'adj_defense' in duke_rating
         assert 'games_played' in duke_rating
     
-    def test_power_ratings_strength_of_schedule(self, sample_games):
+    def test_power_ratings_strength_of_schedule(self, fitted_pr):
         """Test strength of schedule calculation."""
-        from model_training.power_ratings import PowerRatings
-        
-        pr = PowerRatings(n_iterations=5)
-        pr.calculate_ratings(sample_games)
-        
         # Duke plays against UNC, Kansas, Kentucky - should have calculable SOS
-        sos = pr.calculate_sos('duke', '2024-25')
+        sos = fitted_pr.calculate_sos('duke', '2024-25')
         assert isinstance(sos, float)
         assert -50 < sos < 50  # Reasonable range
     
-    def test_power_ratings_matchup_features(self, sample_games):
+    def test_power_ratings_matchup_features(self, fitted_pr):
         """Test matchup feature generation."""
-        from model_training.power_ratings import PowerRatings
-        
-        pr = PowerRatings(n_iterations=5)
-        pr.calculate_ratings(sample_games)
-        
-        features = pr.get_matchup_features('duke', 'unc', '2024-25')
+        features = fitted_pr.get_matchup_features('duke', 'unc', '2024-25')
         
         assert 'power_rating_diff' in features
         assert 'off_rating_diff' in features
@@ -92,7 +86,7 @@ class TestPowerRatings:
 class TestHomeAwaySplits:
     """Tests for Phase 2 Task 2.4 - Home/Away Splits."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_games(self):
         """Create sample game data with home/away patterns."""
         # Duke: 3-0 at home, 1-2 on road
@@ -120,19 +114,28 @@ class TestHomeAwaySplits:
             'date': [datetime(2024, 11, i+1) for i in range(len(games))],
         })
     
+    @pytest.fixture(scope="module")
+    def fitted_splits(self, sample_games):
+        """HomeAwaySplits with a 2-game minimum, calculated once."""
+        splits = HomeAwaySplits(min_home_games=2, min_away_games=2)
+        splits.calculate_splits(sample_games)
+        return splits
+    
+    @pytest.fixture(scope="module")
+    def strict_splits(self, sample_games):
+        """HomeAwaySplits requiring 3 home and 3 away games, calculated once."""
+        splits = HomeAwaySplits(min_home_games=3, min_away_games=3)
+        splits.calculate_splits(sample_games)
+        return splits
+    
     def test_home_away_splits_import(self):
         """Test that home/away splits module can be imported."""
         from model_training import home_away_splits
         assert hasattr(home_away_splits, 'HomeAwaySplits')
     
-    def test_splits_calculation(self, sample_games):
+    def test_splits_calculation(self, strict_splits):
         """Test that splits are calculated correctly."""
-        from model_training.home_away_splits import HomeAwaySplits
-        
-        splits = HomeAwaySplits(min_home_games=3, min_away_games=3)
-        splits.calculate_splits(sample_games)
-        
-        duke_splits = splits.get_team_splits('duke', '2024-25')
+        duke_splits = strict_splits.get_team_splits('duke', '2024-25')
         
         # Duke: 3-0 at home = 100% home win rate
         assert duke_splits['home_win_pct'] == 1.0
@@ -140,16 +143,11 @@ class TestHomeAwaySplits:
         
         # Duke: 1-2 on road = 33.3% away win rate
         assert duke_splits['games_away'] == 3
-        assert abs(duke_splits['away_win_pct'] - 0.333) < 0.01
+        assert duke_splits['away_win_pct'] == pytest.approx(1/3, abs=0.01)
     
-    def test_matchup_features(self, sample_games):
+    def test_matchup_features(self, fitted_splits):
         """Test matchup feature generation."""
-        from model_training.home_away_splits import HomeAwaySplits
-        
-        splits = HomeAwaySplits(min_home_games=2, min_away_games=2)
-        splits.calculate_splits(sample_games)
-        
-        features = splits.get_matchup_features('duke', 'unc', '2024-25')
+        features = fitted_splits.get_matchup_features('duke', 'unc', '2024-25')
         
         assert 'home_team_home_wpct' in features
         assert 'away_team_away_wpct' in features
@@ -180,14 +178,11 @@ class TestRestDays:
     
     def test_rest_days_import(self):
         """Test that rest days functions can be imported."""
-        from model_training.home_away_splits import calculate_rest_days, add_rest_days_features
         assert callable(calculate_rest_days)
         assert callable(add_rest_days_features)
     
     def test_rest_days_calculation(self, sample_games):
         """Test rest days calculation for a specific game."""
-        from model_training.home_away_splits import calculate_rest_days
-        
         # Duke's last game before Nov 10 was Nov 5
         # So rest days should be 5
         rest = calculate_rest_days(
@@ -200,8 +195,6 @@ class TestRestDays:
     
     def test_rest_days_first_game(self, sample_games):
         """Test rest days for first game of season."""
-        from model_training.home_away_splits import calculate_rest_days
-        
         # Kansas has no games before Nov 5
         rest = calculate_rest_days(
             game_date=datetime(2024, 11, 5),
@@ -214,8 +207,6 @@ class TestRestDays:
     
     def test_add_rest_days_features(self, sample_games):
         """Test adding rest day features to dataframe."""
-        from model_training.home_away_splits import add_rest_days_features
-        
         upcoming = pd.DataFrame({
             'home_team_id': ['duke'],
             'away_team_id': ['unc'],
@@ -229,71 +220,58 @@ class TestRestDays:
         assert 'rest_advantage' in result.columns
 
 
+@pytest.mark.slow
 class TestPhase2Integration:
     """Integration tests for Phase 2 features with AdaptivePredictor."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_training_data(self):
         """Create larger sample training dataset."""
-        teams = ['Duke', 'UNC', 'Kentucky', 'Kansas', 'Gonzaga', 'Villanova', 
-                 'Michigan', 'UCLA', 'Arizona', 'Baylor']
-        team_ids = [t.lower().replace(' ', '_') for t in teams]
-        
-        games = []
-        game_id = 0
+        rng = np.random.default_rng(0)
+        teams = np.array(['Duke', 'UNC', 'Kentucky', 'Kansas', 'Gonzaga', 'Villanova', 
+                          'Michigan', 'UCLA', 'Arizona', 'Baylor'])
+        team_ids = np.char.replace(np.char.lower(teams), ' ', '_')
         base_date = datetime(2024, 11, 1)
         
-        # Generate matchups
-        for i, home in enumerate(teams):
-            for j, away in enumerate(teams):
-                if i != j and np.random.random() > 0.7:  # Random subset of games
-                    game_id += 1
-                    home_score = np.random.randint(60, 100)
-                    away_score = np.random.randint(60, 100)
-                    games.append({
-                        'game_id': f'g{game_id}',
-                        'home_team': home,
-                        'away_team': away,
-                        'home_score': home_score,
-                        'away_score': away_score,
-                        'home_team_id': team_ids[i],
-                        'away_team_id': team_ids[j],
-                        'season': '2024-25',
-                        'date': base_date + timedelta(days=game_id),
-                        'game_url': f'https://example.com/g{game_id}',
-                    })
+        # Random subset of home/away matchups, excluding teams playing themselves
+        mask = (rng.random((len(teams), len(teams))) > 0.7) & ~np.eye(len(teams), dtype=bool)
+        home_idx, away_idx = np.nonzero(mask)
+        n = home_idx.size
+        game_ids = [f'g{k}' for k in range(1, n + 1)]
         
-        return pd.DataFrame(games)
+        return pd.DataFrame({
+            'game_id': game_ids,
+            'home_team': teams[home_idx],
+            'away_team': teams[away_idx],
+            'home_score': rng.integers(60, 100, n),
+            'away_score': rng.integers(60, 100, n),
+            'home_team_id': team_ids[home_idx],
+            'away_team_id': team_ids[away_idx],
+            'season': '2024-25',
+            'date': base_date + pd.to_timedelta(np.arange(1, n + 1), unit='D'),
+            'game_url': [f'https://example.com/{g}' for g in game_ids],
+        })
     
-    def test_predictor_phase2_init(self, sample_training_data):
-        """Test that predictor initializes Phase 2 features."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
+    @pytest.fixture(scope="module")
+    def fitted_predictor(self, sample_training_data):
+        """AdaptivePredictor with Phase 2 features, fitted once for both tests."""
         predictor = AdaptivePredictor(
             use_power_ratings=True,
             use_home_away_splits=True,
             use_rest_days=True
         )
-        
         predictor.fit(sample_training_data)
-        
+        return predictor
+    
+    def test_predictor_phase2_init(self, fitted_predictor):
+        """Test that predictor initializes Phase 2 features."""
         # Check Phase 2 components initialized
-        assert predictor._power_ratings is not None or not predictor.use_power_ratings
-        assert predictor._home_away_splits is not None or not predictor.use_home_away_splits
-        assert predictor._historical_games is not None
+        assert fitted_predictor._power_ratings is not None or not fitted_predictor.use_power_ratings
+        assert fitted_predictor._home_away_splits is not None or not fitted_predictor.use_home_away_splits
+        assert fitted_predictor._historical_games is not None
     
-    def test_predictor_phase2_prediction(self, sample_training_data):
+    def test_predictor_phase2_prediction(self, fitted_predictor):
         """Test that predictions work with Phase 2 features."""
-        from model_training.adaptive_predictor import AdaptivePredictor
-        
-        predictor = AdaptivePredictor(
-            use_power_ratings=True,
-            use_home_away_splits=True,
-            use_rest_days=True
-        )
-        
-        predictor.fit(sample_training_data)
-        
         # Create upcoming game
         upcoming = pd.DataFrame({
             'game_id': ['upcoming1'],
@@ -306,7 +284,7 @@ class TestPhase2Integration:
             'game_url': ['https://example.com/upcoming1'],
         })
         
-        results = predictor.predict(upcoming, skip_low_data=False)
+        results = fitted_predictor.predict(upcoming, skip_low_data=False)
         
         assert len(results) == 1
         assert 'predicted_winner' in results.columns
@@ -9,60 +9,120 @@ Tests for:
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+FEATURE_COLS = (
+    'home_team_encoded', 'away_team_encoded', 'is_neutral',
+    'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
+)
 
-@pytest.fixture
+# Seeded generator for fixture data; avoids touching NumPy's global RNG state
+RNG = np.random.default_rng(42)
+
+# Tests check that training completes, not model quality, so keep the forest small
+SMALL_RF_PARAMS = {'n_estimators': 10, 'max_depth': 4}
+
+# Keep the session-scoped training data on one xdist worker
+pytestmark = pytest.mark.xdist_group(name="phase3")
+
+
+@pytest.fixture(scope="session")
 def sample_training_data():
-    """Create sample training data with dates."""
-    np.random.seed(42)
+    """Create sample training data with dates (shared read-only across the session)."""
     n_games = 500
     
     teams = ['Duke', 'UNC', 'Kentucky', 'Kansas', 'Gonzaga', 'Villanova', 
              'Michigan', 'UCLA', 'Arizona', 'Baylor', 'Houston', 'Purdue']
     
-    games = []
-    base_date = datetime(2024, 11, 1)
+    # Draw every column in one batch with compact dtypes; re-roll only the
+    # rows where a team plays itself
+    home_idx = RNG.integers(0, len(teams), n_games, dtype=np.int16)
+    away_idx = RNG.integers(0, len(teams), n_games, dtype=np.int16)
+    while (same := home_idx == away_idx).any():
+        away_idx[same] = RNG.integers(0, len(teams), same.sum(), dtype=np.int16)
     
-    for i in range(n_games):
-        home_idx = np.random.randint(0, len(teams))
-        away_idx = np.random.randint(0, len(teams))
-        while away_idx == home_idx:
-            away_idx = np.random.randint(0, len(teams))
-        
-        home_score = np.random.randint(55, 95)
-        away_score = np.random.randint(55, 95)
-        
-        games.append({
-            'game_id': f'g{i}',
-            'home_team': teams[home_idx],
-            'away_team': teams[away_idx],
-            'home_score': home_score,
-            'away_score': away_score,
-            'home_team_encoded': home_idx,
-            'away_team_encoded': away_idx,
-            'is_neutral': np.random.choice([0, 1], p=[0.9, 0.1]),
-            'home_rank': np.random.randint(1, 100),
-            'away_rank': np.random.randint(1, 100),
-            'rank_diff': 0,  # Will be calculated
-            'is_ranked_matchup': 0,  # Will be calculated
-            'home_win': int(home_score > away_score),
-            'date': base_date + timedelta(days=i // 10),
-            'game_url': f'https://example.com/g{i}',
-        })
+    home_score = RNG.integers(55, 95, n_games, dtype=np.int16)
+    away_score = RNG.integers(55, 95, n_games, dtype=np.int16)
+    home_rank = RNG.integers(1, 100, n_games, dtype=np.int16)
+    away_rank = RNG.integers(1, 100, n_games, dtype=np.int16)
+    game_ids = [f'g{i}' for i in range(n_games)]
+    # Ten games per day starting 2024-11-01
+    dates = np.datetime64('2024-11-01') + (np.arange(n_games) // 10).astype('timedelta64[D]')
+    dates = dates.astype('datetime64[ns]')
     
-    df = pd.DataFrame(games)
-    df['rank_diff'] = df['home_rank'] - df['away_rank']
-    df['is_ranked_matchup'] = ((df['home_rank'] <= 25) | (df['away_rank'] <= 25)).astype(int)
+    df = pd.DataFrame({
+        'game_id': game_ids,
+        'home_team': pd.Categorical.from_codes(home_idx, categories=teams),
+        'away_team': pd.Categorical.from_codes(away_idx, categories=teams),
+        'home_score': home_score,
+        'away_score': away_score,
+        'home_team_encoded': home_idx,
+        'away_team_encoded': away_idx,
+        'is_neutral': RNG.choice(np.array([0, 1], dtype=np.int8), size=n_games, p=[0.9, 0.1]),
+        'home_rank': home_rank,
+        'away_rank': away_rank,
+        'rank_diff': home_rank - away_rank,
+        'is_ranked_matchup': ((home_rank <= 25) | (away_rank <= 25)).astype(np.int8),
+        'home_win': (home_score > away_score).astype(np.int8),
+        'date': dates,
+        'game_url': [f'https://example.com/{g}' for g in game_ids],
+    })
     
     return df
 
 
+@pytest.fixture(scope="session")
+def has_xgboost():
+    """Probe XGBoost availability once per session."""
+    from model_training.ensemble_predictor import HAS_XGBOOST
+    return HAS_XGBOOST
+
+
+@pytest.fixture(scope="session")
+def X_train(sample_training_data):
+    """Feature matrix slice of the sample data, selected once."""
+    return sample_training_data[list(FEATURE_COLS)]
+
+
+@pytest.fixture(scope="module")
+def trained_ensemble(sample_training_data):
+    """RF + logistic ensemble (no XGBoost) fitted once on the sample data."""
+    from model_training.ensemble_predictor import EnsemblePredictor
+    
+    ensemble = EnsemblePredictor(
+        use_xgboost=False,  # Skip XGBoost if not installed
+        use_random_forest=True,
+        use_logistic=True,
+        validation_days=7,
+        rf_params=SMALL_RF_PARAMS,
+    )
+    ensemble.fit(sample_training_data, feature_cols=list(FEATURE_COLS))
+    return ensemble
+
+
+@pytest.fixture(scope="module")
+def trained_xgb_ensemble(sample_training_data, has_xgboost):
+    """Ensemble including XGBoost, fitted once; skips when XGBoost is missing."""
+    from model_training.ensemble_predictor import EnsemblePredictor
+    
+    if not has_xgboost:
+        pytest.skip("XGBoost not installed")
+    
+    ensemble = EnsemblePredictor(
+        use_xgboost=True,
+        use_random_forest=True,
+        use_logistic=True,
+        validation_days=7,
+        rf_params=SMALL_RF_PARAMS,
+    )
+    ensemble.fit(sample_training_data, feature_cols=list(FEATURE_COLS))
+    return ensemble
+
+
 class TestEnsemblePredictor:
     """Tests for Phase 3 Task 3.3 - Ensemble Model."""
     
@@ -79,79 +139,33 @@ class TestEnsemblePredictor:
         
         # Check weights are set
         assert 'random_forest' in ensemble.weights
-        assert sum(ensemble.weights.values()) == pytest.approx(1.0, abs=0.01)
+        assert sum(ensemble.weights.values()) == pytest.approx(1.0, abs=1e-12)
     
-    def test_ensemble_training(self, sample_training_data):
+    def test_ensemble_training(self, trained_ensemble):
         """Test ensemble training on sample data."""
-        from model_training.ensemble_predictor import EnsemblePredictor
-        
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
-        ]
-        
-        ensemble = EnsemblePredictor(
-            use_xgboost=False,  # Skip XGBoost if not installed
-            use_random_forest=True,
-            use_logistic=True,
-            validation_days=7
-        )
-        
-        ensemble.fit(sample_training_data, feature_cols=feature_cols)
-        
         # Check models were trained
-        assert len(ensemble.models) >= 1
-        assert 'random_forest' in ensemble.models or 'logistic' in ensemble.models
+        assert len(trained_ensemble.models) >= 1
+        assert 'random_forest' in trained_ensemble.models or 'logistic' in trained_ensemble.models
     
-    def test_ensemble_prediction(self, sample_training_data):
+    def test_ensemble_prediction(self, trained_ensemble, X_train):
         """Test ensemble predictions."""
-        from model_training.ensemble_predictor import EnsemblePredictor
-        
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
-        ]
-        
-        ensemble = EnsemblePredictor(
-            use_xgboost=False,
-            use_random_forest=True,
-            use_logistic=True,
-            validation_days=7
-        )
-        
-        ensemble.fit(sample_training_data, feature_cols=feature_cols)
-        
         # Make predictions on sample data
-        X_test = sample_training_data[feature_cols].head(10)
-        predictions = ensemble.predict(X_test)
-        proba = ensemble.predict_proba(X_test)
+        X_test = X_train.head(10)
+        proba = trained_ensemble.predict_proba(X_test)
+        # predict() thresholds the home-win probability at 0.5
+        predictions = (proba[:, 1] > 0.5).astype(int)
         
         assert len(predictions) == 10
-        assert set(predictions).issubset({0, 1})
+        assert ((predictions == 0) | (predictions == 1)).all()
         assert proba.shape == (10, 2)
         assert np.allclose(proba.sum(axis=1), 1.0)
+        np.testing.assert_array_equal(trained_ensemble.predict(X_test), predictions)
     
-    def test_ensemble_validation_accuracy(self, sample_training_data):
+    def test_ensemble_validation_accuracy(self, trained_ensemble):
         """Test that validation accuracy is recorded."""
-        from model_training.ensemble_predictor import EnsemblePredictor
-        
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
-        ]
-        
-        ensemble = EnsemblePredictor(
-            use_xgboost=False,
-            use_random_forest=True,
-            use_logistic=True,
-            validation_days=7
-        )
-        
-        ensemble.fit(sample_training_data, feature_cols=feature_cols)
-        
         # Check validation metrics exist
-        assert len(ensemble.validation_accuracy) > 0
-        for model_name, accuracy in ensemble.validation_accuracy.items():
+        assert len(trained_ensemble.validation_accuracy) > 0
+        for model_name, accuracy in trained_ensemble.validation_accuracy.items():
             assert 0 <= accuracy <= 1
 
 
@@ -162,8 +176,9 @@ class TestTemporalSplit:
         """Test that temporal split prevents data leakage."""
         from model_training.ensemble_predictor import EnsemblePredictor
         
-        ensemble = EnsemblePredictor(validation_days=14)
-        train_df, val_df = ensemble.create_temporal_split(sample_training_data)
+        train_df, val_df = EnsemblePredictor.create_temporal_split(
+            sample_training_data, val_days=14
+        )
         
         # Ensure no overlap - all training dates < all validation dates
         train_max_date = train_df['date'].max()
@@ -175,8 +190,9 @@ class TestTemporalSplit:
         """Test temporal split produces reasonable sizes."""
         from model_training.ensemble_predictor import EnsemblePredictor
         
-        ensemble = EnsemblePredictor(validation_days=7)
-        train_df, val_df = ensemble.create_temporal_split(sample_training_data)
+        train_df, val_df = EnsemblePredictor.create_temporal_split(
+            sample_training_data, val_days=7
+        )
         
         # Training should be larger than validation
         assert len(train_df) > len(val_df)
@@ -186,11 +202,8 @@ class TestTemporalSplit:
         """Test different validation day settings."""
         from model_training.ensemble_predictor import EnsemblePredictor
         
-        ensemble_7 = EnsemblePredictor(validation_days=7)
-        ensemble_14 = EnsemblePredictor(validation_days=14)
-        
-        _, val_7 = ensemble_7.create_temporal_split(sample_training_data)
-        _, val_14 = ensemble_14.create_temporal_split(sample_training_data)
+        _, val_7 = EnsemblePredictor.create_temporal_split(sample_training_data, val_days=7)
+        _, val_14 = EnsemblePredictor.create_temporal_split(sample_training_data, val_days=14)
         
         # 14-day validation should have more games
         assert len(val_14) >= len(val_7)
@@ -199,60 +212,47 @@ class TestTemporalSplit:
 class TestXGBoostIntegration:
     """Tests for Phase 3 Task 3.1 - XGBoost Integration."""
     
-    def test_xgboost_available_check(self):
+    def test_xgboost_available_check(self, has_xgboost):
         """Test XGBoost availability detection."""
-        from model_training.ensemble_predictor import HAS_XGBOOST
-        
         # This will be True or False depending on installation
-        assert isinstance(HAS_XGBOOST, bool)
+        assert isinstance(has_xgboost, bool)
     
-    def test_ensemble_with_xgboost(self, sample_training_data):
+    def test_ensemble_with_xgboost(self, trained_xgb_ensemble):
         """Test ensemble with XGBoost if available."""
-        from model_training.ensemble_predictor import EnsemblePredictor, HAS_XGBOOST
+        # XGBoost should be in models
+        assert 'xgboost' in trained_xgb_ensemble.models
+        assert 'xgboost' in trained_xgb_ensemble.validation_accuracy
+        # 500 rows is below GPU_MIN_ROWS, so device='auto' stays on the CPU
+        assert trained_xgb_ensemble.xgb_device == 'cpu'
+    
+    @pytest.mark.parametrize('device', ['cpu', 'cuda'])
+    def test_xgboost_device(self, sample_training_data, has_xgboost, device):
+        """Test XGBoost trains on an explicitly requested device."""
+        from model_training.ensemble_predictor import EnsemblePredictor, xgboost_cuda_available
         
-        if not HAS_XGBOOST:
+        if not has_xgboost:
             pytest.skip("XGBoost not installed")
-        
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
-        ]
+        if device == 'cuda' and not xgboost_cuda_available():
+            pytest.skip("No CUDA device available to XGBoost")
         
         ensemble = EnsemblePredictor(
             use_xgboost=True,
-            use_random_forest=True,
-            use_logistic=True,
-            validation_days=7
+            use_random_forest=False,
+            use_logistic=False,
+            validation_days=7,
+            device=device,
         )
+        ensemble.fit(sample_training_data, feature_cols=list(FEATURE_COLS))
         
-        ensemble.fit(sample_training_data, feature_cols=feature_cols)
-        
-        # XGBoost should be in models
+        assert ensemble.xgb_device == device
         assert 'xgboost' in ensemble.models
-        assert 'xgboost' in ensemble.validation_accuracy
     
-    def test_xgboost_fallback(self, sample_training_data):
+    def test_xgboost_fallback(self, trained_ensemble, X_train):
         """Test graceful fallback when XGBoost requested but not available."""
-        from model_training.ensemble_predictor import EnsemblePredictor
-        
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff', 'is_ranked_matchup'
-        ]
-        
-        # Force XGBoost off to simulate not installed
-        ensemble = EnsemblePredictor(
-            use_xgboost=False,  # Explicitly disabled
-            use_random_forest=True,
-            use_logistic=True,
-            validation_days=7
-        )
-        
-        # Should still work with other models
-        ensemble.fit(sample_training_data, feature_cols=feature_cols)
-        
-        assert len(ensemble.models) >= 1
-        predictions = ensemble.predict(sample_training_data[feature_cols].head(5))
+        # trained_ensemble has XGBoost explicitly disabled to simulate not installed;
+        # it should still work with the other models
+        assert len(trained_ensemble.models) >= 1
+        predictions = trained_ensemble.predict(X_train.head(5))
         assert len(predictions) == 5
 
 
@@ -278,19 +278,18 @@ class TestAdaptivePredictorPhase3:
         predictor = AdaptivePredictor(use_ensemble=False)
         assert predictor.use_ensemble == False
     
-    def test_xgboost_model_type(self):
+    def test_xgboost_model_type(self, has_xgboost):
         """Test XGBoost model type if available."""
         from model_training.adaptive_predictor import AdaptivePredictor
         
-        try:
-            import xgboost
-            # Note: model_type may be overridden by feature_flags.json
-            # so we just verify the parameter is accepted
-            predictor = AdaptivePredictor(model_type='xgboost')
-            # The model_type should be 'xgboost' unless overridden by flags
-            assert predictor.model_type in ['xgboost', 'random_forest']
-        except ImportError:
+        if not has_xgboost:
             pytest.skip("XGBoost not installed")
+        
+        # Note: model_type may be overridden by feature_flags.json
+        # so we just verify the parameter is accepted
+        predictor = AdaptivePredictor(model_type='xgboost')
+        # The model_type should be 'xgboost' unless overridden by flags
+        assert predictor.model_type in ['xgboost', 'random_forest']
 
 
 class TestModelWeights:
@@ -306,16 +305,13 @@ class TestModelWeights:
         )
         
         # Weights should be normalized
-        assert sum(ensemble.weights.values()) == pytest.approx(1.0, abs=0.01)
+        assert sum(ensemble.weights.values()) == pytest.approx(1.0, abs=1e-12)
     
     def test_custom_weights(self, sample_training_data):
         """Test custom weight configuration."""
         from model_training.ensemble_predictor import EnsemblePredictor
         
-        feature_cols = [
-            'home_team_encoded', 'away_team_encoded', 'is_neutral',
-            'home_rank', 'away_rank', 'rank_diff'
-        ]
+        feature_cols = list(FEATURE_COLS[:-1])  # All but is_ranked_matchup
         
         # Heavy weight on random forest
         ensemble = EnsemblePredictor(
@@ -323,7 +319,8 @@ class TestModelWeights:
             use_xgboost=False,
             use_random_forest=True,
             use_logistic=True,
-            validation_days=7
+            validation_days=7,
+            rf_params=SMALL_RF_PARAMS,
         )
         
         ensemble.fit(sample_training_data, feature_cols=feature_cols)
@@ -334,4 +331,10 @@ class TestModelWeights:
 
 
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
+    args = [__file__, '-v']
+    try:
+        import xdist  # noqa: F401
+        args += ['-n', 'auto', '--dist', 'loadgroup']
+    except ImportError:
+        pass
+    pytest.main(args)
@@ -8,7 +8,7 @@ Task 4.2: Recency Weighting / Momentum
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import sys
 import os
 
@@ -21,42 +21,47 @@ from model_training.recency_weighting import (
     apply_recency_weights
 )
 
+# Seeded generator for fixture data; avoids touching NumPy's global RNG state
+RNG = np.random.default_rng(42)
+
+# Keep the session-scoped games/ratings fixtures on one xdist worker
+pytestmark = pytest.mark.xdist_group(name="phase4")
+
 
 # ============================================================================
 # Test Fixtures
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_games_df():
-    """Create sample games data for testing."""
-    np.random.seed(42)
+    """Create sample games data for testing (shared read-only across the session)."""
+    n_games = 50
     
-    teams = ['Duke', 'UNC', 'Kentucky', 'Kansas', 'Gonzaga', 
-             'UCLA', 'Michigan', 'Ohio State', 'Villanova', 'Baylor']
+    teams = np.array(['Duke', 'UNC', 'Kentucky', 'Kansas', 'Gonzaga', 
+                      'UCLA', 'Michigan', 'Ohio State', 'Villanova', 'Baylor'])
     
-    games = []
-    base_date = datetime(2025, 11, 1)
+    # Row i lists every team index except i, so away teams never equal the home team
+    n_teams = len(teams)
+    opp_table = np.array([np.delete(np.arange(n_teams), i) for i in range(n_teams)])
+    home_idx = RNG.integers(0, n_teams, n_games)
+    away_idx = opp_table[home_idx, RNG.integers(0, n_teams - 1, n_games)]
+    # Categorical team columns carry integer codes into the library's groupbys
+    home = pd.Categorical.from_codes(home_idx, categories=teams)
+    away = pd.Categorical.from_codes(away_idx, categories=teams)
     
-    for i in range(50):
-        home = np.random.choice(teams)
-        away = np.random.choice([t for t in teams if t != home])
-        
-        home_score = np.random.randint(60, 100)
-        away_score = np.random.randint(60, 100)
-        
-        games.append({
-            'game_id': f'game_{i}',
-            'date': base_date + timedelta(days=i % 30),
-            'home_team': home,
-            'away_team': away,
-            'home_score': home_score,
-            'away_score': away_score
-        })
+    dates = np.datetime64('2025-11-01') + (np.arange(n_games) % 30).astype('timedelta64[D]')
     
-    return pd.DataFrame(games)
+    return pd.DataFrame({
+        'game_id': [f'game_{i}' for i in range(n_games)],
+        'date': dates.astype('datetime64[ns]'),
+        'home_team': home,
+        'away_team': away,
+        'home_score': RNG.integers(60, 100, n_games, dtype=np.int16),
+        'away_score': RNG.integers(60, 100, n_games, dtype=np.int16),
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def team_ratings():
     """Create sample team power ratings."""
     return {
@@ -73,7 +78,7 @@ def team_ratings():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def conference_mapping():
     """Create sample conference mapping."""
     return {
@@ -108,7 +113,7 @@ class TestConferenceStrength:
     def test_calculate_ratings_from_team_ratings(self, sample_games_df, team_ratings, conference_mapping):
         """Test calculating conference ratings from team ratings."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         
         ratings = cs.calculate_ratings(sample_games_df, team_ratings)
         
@@ -119,7 +124,7 @@ class TestConferenceStrength:
     def test_calculate_ratings_without_team_ratings(self, sample_games_df, conference_mapping):
         """Test calculating ratings from non-conference games only."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         
         ratings = cs.calculate_ratings(sample_games_df)
         
@@ -129,7 +134,7 @@ class TestConferenceStrength:
     def test_get_conference(self, conference_mapping):
         """Test getting conference for a team."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         
         assert cs.get_conference('Duke') == 'ACC'
         assert cs.get_conference('Kentucky') == 'SEC'
@@ -138,7 +143,7 @@ class TestConferenceStrength:
     def test_get_conference_rating(self, sample_games_df, team_ratings, conference_mapping):
         """Test getting conference rating."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         cs.calculate_ratings(sample_games_df, team_ratings)
         
         rating = cs.get_conference_rating('ACC')
@@ -147,7 +152,7 @@ class TestConferenceStrength:
     def test_get_conference_differential(self, sample_games_df, team_ratings, conference_mapping):
         """Test getting conference differential between two teams."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         cs.calculate_ratings(sample_games_df, team_ratings)
         
         diff = cs.get_conference_differential('Duke', 'Kentucky')
@@ -158,7 +163,7 @@ class TestConferenceStrength:
     def test_get_rankings(self, sample_games_df, team_ratings, conference_mapping):
         """Test getting conference rankings as DataFrame."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         cs.calculate_ratings(sample_games_df, team_ratings)
         
         rankings = cs.get_rankings()
@@ -175,7 +180,7 @@ class TestAddConferenceFeatures:
     def test_add_conference_features(self, sample_games_df, team_ratings, conference_mapping):
         """Test adding conference features to games dataframe."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         cs.calculate_ratings(sample_games_df, team_ratings)
         
         enriched = add_conference_features(sample_games_df, cs)
@@ -188,18 +193,17 @@ class TestAddConferenceFeatures:
     def test_conference_features_values(self, sample_games_df, team_ratings, conference_mapping):
         """Test that conference features have valid values."""
         cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
+        cs.team_conferences = dict(conference_mapping)
         cs.calculate_ratings(sample_games_df, team_ratings)
         
         enriched = add_conference_features(sample_games_df, cs)
         
         # Ratings should be positive numbers
-        assert enriched['home_conf_rating'].notna().all()
-        assert enriched['away_conf_rating'].notna().all()
+        assert not enriched[['home_conf_rating', 'away_conf_rating']].isna().any().any()
         
         # Differential should be calculated correctly
         expected_diff = enriched['home_conf_rating'] - enriched['away_conf_rating']
-        assert np.allclose(enriched['conf_rating_diff'], expected_diff)
+        np.testing.assert_array_equal(enriched['conf_rating_diff'], expected_diff)
 
 
 # ============================================================================
@@ -255,20 +259,35 @@ class TestRecencyWeighting:
         """Test weighted average calculation."""
         rw = RecencyWeighting(half_life_days=14)
         
-        reference = datetime(2025, 11, 15)
-        values = [1.0, 0.0, 1.0, 1.0]  # W, L, W, W
-        dates = [
-            datetime(2025, 11, 14),  # 1 day ago (high weight)
-            datetime(2025, 11, 10),  # 5 days ago
-            datetime(2025, 11, 5),   # 10 days ago
-            datetime(2025, 11, 1),   # 14 days ago (half weight)
-        ]
+        reference = np.datetime64('2025-11-15')
+        values = np.array([1.0, 0.0, 1.0, 1.0])  # W, L, W, W
+        dates = np.array([
+            '2025-11-14',  # 1 day ago (high weight)
+            '2025-11-10',  # 5 days ago
+            '2025-11-05',  # 10 days ago
+            '2025-11-01',  # 14 days ago (half weight)
+        ], dtype='datetime64[D]')
         
         avg = rw.calculate_weighted_average(values, dates, reference)
         
         # Recent win should pull average up
         assert avg > 0.5  # Above simple average (3/4 = 0.75)
     
+    def test_calculate_weighted_average_matches_per_game_weights(self):
+        """Test the batched weighted average against per-game calculate_weight."""
+        rw = RecencyWeighting(half_life_days=14)
+        
+        rng = np.random.default_rng(0)
+        reference = datetime(2025, 11, 15)
+        dates = np.datetime64('2025-09-01') + rng.integers(0, 90, 10_000).astype('timedelta64[D]')
+        values = rng.random(10_000)
+        
+        weights = [rw.calculate_weight(pd.Timestamp(d).to_pydatetime(), reference) for d in dates]
+        
+        avg = rw.calculate_weighted_average(values, dates, reference)
+        
+        assert avg == pytest.approx(np.average(values, weights=weights))
+    
     def test_calculate_momentum(self, sample_games_df):
         """Test momentum calculation for all teams."""
         rw = RecencyWeighting()
@@ -281,6 +300,42 @@ class TestRecencyWeighting:
         for team, m in momentum.items():
             assert -1.0 <= m <= 1.0
     
+    def test_calculate_momentum_matches_per_team_games(self):
+        """Test batched momentum against each team's own last 10 games."""
+        rw = RecencyWeighting()
+        
+        rng = np.random.default_rng(0)
+        n_games, n_teams = 10_000, 300
+        home_idx = rng.integers(0, n_teams, n_games)
+        away_idx = (home_idx + rng.integers(1, n_teams, n_games)) % n_teams
+        games = pd.DataFrame({
+            # Distinct timestamps keep each team's game order unambiguous
+            'date': np.datetime64('2025-11-01', 'ns') + rng.permutation(n_games).astype('timedelta64[m]'),
+            'home_team': [f'T{i}' for i in home_idx],
+            'away_team': [f'T{i}' for i in away_idx],
+            'home_score': rng.integers(60, 100, n_games),
+            'away_score': rng.integers(60, 100, n_games),
+        })
+        reference = games['date'].max()
+        
+        momentum = rw.calculate_momentum(games)
+        
+        for team in ['T0', 'T1', 'T150', 'T299']:
+            team_games = games[(games['home_team'] == team) | (games['away_team'] == team)]
+            last_10 = team_games.sort_values('date', ascending=False).head(10)
+            is_home = last_10['home_team'] == team
+            won = np.where(is_home, last_10['home_score'] > last_10['away_score'],
+                           last_10['away_score'] > last_10['home_score']).astype(int)
+        
+            win_rate = rw.calculate_weighted_average(won, last_10['date'].to_numpy(), reference)
+            run = np.argmax(won != won[0]) if (won != won[0]).any() else len(won)
+            streak = run if won[0] == 1 else -run
+            expected = np.clip((win_rate - 0.5) * 2 + min(run, 5) * 0.05 * np.sign(streak), -1, 1)
+        
+            assert rw.team_streak[team] == streak
+            assert rw.team_last_results[team] == won[:5].tolist()
+            assert momentum[team] == pytest.approx(expected)
+    
     def test_get_momentum(self, sample_games_df):
         """Test getting momentum for a specific team."""
         rw = RecencyWeighting()
@@ -349,7 +404,7 @@ class TestAddMomentumFeatures:
         
         # Differential should be calculated correctly
         expected_diff = enriched['home_momentum'] - enriched['away_momentum']
-        assert np.allclose(enriched['momentum_diff'], expected_diff)
+        np.testing.assert_array_equal(enriched['momentum_diff'], expected_diff)
 
 
 class TestApplyRecencyWeights:
@@ -378,23 +433,27 @@ class TestApplyRecencyWeights:
 # Integration Tests
 # ============================================================================
 
+@pytest.fixture(scope="class")
+def enriched_df(sample_games_df, team_ratings, conference_mapping):
+    """Games enriched with conference strength and momentum features."""
+    # Conference strength
+    cs = ConferenceStrength()
+    cs.team_conferences = dict(conference_mapping)
+    cs.calculate_ratings(sample_games_df, team_ratings)
+
+    # Recency weighting
+    rw = RecencyWeighting()
+
+    # Apply both
+    enriched = add_conference_features(sample_games_df, cs)
+    return add_momentum_features(enriched, rw, games_df=sample_games_df)
+
+
 class TestPhase4Integration:
     """Integration tests for Phase 4 features."""
     
-    def test_all_phase4_features(self, sample_games_df, team_ratings, conference_mapping):
+    def test_all_phase4_features(self, enriched_df):
         """Test combining all Phase 4 features."""
-        # Conference strength
-        cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
-        cs.calculate_ratings(sample_games_df, team_ratings)
-        
-        # Recency weighting
-        rw = RecencyWeighting()
-        
-        # Apply both
-        enriched = add_conference_features(sample_games_df, cs)
-        enriched = add_momentum_features(enriched, rw, games_df=sample_games_df)
-        
         # Check all features present
         expected_cols = [
             'home_conf_rating', 'away_conf_rating', 'conf_rating_diff',
@@ -403,27 +462,25 @@ class TestPhase4Integration:
         ]
         
         for col in expected_cols:
-            assert col in enriched.columns, f"Missing column: {col}"
+            assert col in enriched_df.columns, f"Missing column: {col}"
     
-    def test_phase4_features_no_nan(self, sample_games_df, team_ratings, conference_mapping):
+    def test_phase4_features_no_nan(self, enriched_df):
         """Test that Phase 4 features don't introduce NaN values."""
-        cs = ConferenceStrength()
-        cs.team_conferences = conference_mapping
-        cs.calculate_ratings(sample_games_df, team_ratings)
-        
-        rw = RecencyWeighting()
-        
-        enriched = add_conference_features(sample_games_df, cs)
-        enriched = add_momentum_features(enriched, rw, games_df=sample_games_df)
-        
         phase4_cols = [
             'home_conf_rating', 'away_conf_rating', 'conf_rating_diff',
             'home_momentum', 'away_momentum', 'momentum_diff'
         ]
         
-        for col in phase4_cols:
-            assert enriched[col].notna().all(), f"NaN values in {col}"
+        nan_mask = enriched_df[phase4_cols].isna()
+        # The message (per-column NaN counts) is only built when the assertion fails
+        assert not nan_mask.any().any(), f"NaN values in:\n{nan_mask.sum()[lambda c: c > 0]}"
 
 
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
+    args = [__file__, '-v']
+    try:
+        import xdist  # noqa: F401
+        args += ['-n', 'auto', '--dist', 'loadgroup']
+    except ImportError:
+        pass
+    pytest.main(args)
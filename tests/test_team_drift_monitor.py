@@ -1,7 +1,12 @@
 import pandas as pd
+import pytest
 from model_training.team_id_utils import derive_team_id, melt_games_to_team_rows, ensure_team_ids
+from model_training import team_drift_monitor
 from model_training.team_drift_monitor import build_team_rows
 
+IND = derive_team_id('Indiana')
+PUR = derive_team_id('Purdue')
+
 
 def test_derive_team_id_stability():
     a = derive_team_id('Indiana Hoosiers')
@@ -14,41 +19,53 @@ def test_derive_team_id_stability():
     assert a != d
 
 
-def test_melt_games_to_team_rows_basic():
-    df = pd.DataFrame([
+@pytest.fixture(scope="module")
+def games():
+    return pd.DataFrame([
         {
             'game_id': 'g1', 'home_team': 'Indiana Hoosiers', 'away_team': 'Purdue Boilermakers',
-            'home_team_id': derive_team_id('Indiana'), 'away_team_id': derive_team_id('Purdue'),
+            'home_team_id': IND, 'away_team_id': PUR,
             'pred_prob': 0.65, 'label': 1, 'season': '2025-26', 'date': '2025-11-05'
         }
-    ])
-    melted = melt_games_to_team_rows(df)
-    assert len(melted) == 2
-    home_row = melted[melted['team_id'] == derive_team_id('Indiana')].iloc[0]
-    away_row = melted[melted['team_id'] == derive_team_id('Purdue')].iloc[0]
-    assert home_row['team_pred_prob'] == 0.65
-    assert away_row['team_pred_prob'] == 0.35
-    assert home_row['team_label'] == 1
-    assert away_row['team_label'] == 0
+    ]).astype({'label': 'int8'})
 
 
-def test_build_team_rows_end_to_end_minimal():
-    # Construct minimal Completed + predictions merge mimic
-    comp = pd.DataFrame([
+@pytest.fixture(scope="module")
+def comp():
+    return pd.DataFrame([
         {
             'game_id': 'g1', 'home_team': 'Indiana Hoosiers', 'away_team': 'Purdue Boilermakers',
             'home_score': 72, 'away_score': 69, 'Season': '2025-26', 'date': '2025-11-05',
             'game_status': 'Final'
         }
-    ])
-    preds = pd.DataFrame([
+    ]).astype({'home_score': 'int16', 'away_score': 'int16'})
+
+
+@pytest.fixture(scope="module")
+def preds():
+    return pd.DataFrame([
         {
             'game_id': 'g1', 'home_team': 'Indiana Hoosiers', 'away_team': 'Purdue Boilermakers',
             'home_win_probability': 0.62, 'source': 'live', 'prediction_timestamp': '2025-11-05T01:00:00Z'
         }
     ])
+
+
+def test_melt_games_to_team_rows_basic(games):
+    melted = melt_games_to_team_rows(games)
+    assert len(melted) == 2
+    home_row = melted[melted['team_id'] == IND].iloc[0]
+    away_row = melted[melted['team_id'] == PUR].iloc[0]
+    assert home_row['team_pred_prob'] == 0.65
+    assert away_row['team_pred_prob'] == 0.35
+    assert home_row['team_label'] == 1
+    assert away_row['team_label'] == 0
+
+
+def test_build_team_rows_end_to_end_minimal(comp, preds):
+    # Construct minimal Completed + predictions merge mimic
     # Prepare labels & merge like drift monitor does
-    # Ensure IDs
+    # Ensure IDs (returns copies, so the shared fixtures stay untouched)
     comp = ensure_team_ids(comp)
     preds = ensure_team_ids(preds)
     # Simulate merged structure expected by build_team_rows via monkeypatch approach
@@ -59,8 +76,15 @@ def test_build_team_rows_end_to_end_minimal():
     # Instead, directly call internal utils to avoid file IO complexity; replicate logic here.
     melted = melt_games_to_team_rows(merged_like)
     assert len(melted) == 2
-    # Compute metrics manually for window=1 using build_team_rows by injecting precomputed merged
+
+
+def test_build_team_rows_from_stubbed_loaders(comp, preds, monkeypatch):
+    # Feed build_team_rows in-memory frames instead of reading the real data files
+    monkeypatch.setattr(team_drift_monitor, 'load_completed', lambda: comp.copy())
+    # Prediction sources carry no team names, so the merge keeps comp's home/away columns
+    monkeypatch.setattr(team_drift_monitor, 'load_prediction_sources',
+                        lambda: preds.drop(columns=['home_team', 'away_team']))
     metrics = build_team_rows(window=1)
-    # build_team_rows will read real files; we can't guarantee environment here, so we just assert our melted logic earlier.
-    # This test mainly validates no exceptions in helper functions.
-    assert True
+    assert set(metrics['team_id']) == {IND, PUR}
+    assert (metrics['games_seen_team'] == 1).all()
+    assert (metrics['cumulative_accuracy_team'] == 1.0).all()
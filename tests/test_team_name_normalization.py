@@ -1,12 +1,4 @@
-import os
-import sys
-
-# Ensure repository root on path
-REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-if REPO_ROOT not in sys.path:
-    sys.path.insert(0, REPO_ROOT)
-
-from data_collection.team_name_utils import normalize_team_name  # noqa: E402
+from data_collection.team_name_utils import normalize_team_name
 
 
 def test_penn_vs_penn_state_distinct():
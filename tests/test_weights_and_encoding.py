@@ -1,15 +1,11 @@
-import os
-import sys
+import pytest
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 
-# Ensure repository root is on the path for local package imports
-REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-if REPO_ROOT not in sys.path:
-    sys.path.insert(0, REPO_ROOT)
+from sklearn.preprocessing import LabelEncoder
 
-from model_training.model_bakeoff import calculate_sample_weights, prepare_data  # noqa: E402
+from model_training.adaptive_predictor import AdaptivePredictor
+from model_training.model_bakeoff import calculate_sample_weights, prepare_data
 
 def make_dummy_df():
     data = {
@@ -23,28 +19,32 @@ def make_dummy_df():
         'home_rank':[10,20,30,10,20,30],
         'away_rank':[15,25,35,15,25,35]
     }
-    df = pd.DataFrame(data)
+    # Store season and team labels as categoricals, one code per distinct value
+    df = pd.DataFrame(data).astype({
+        'season': 'category', 'home_team': 'category', 'away_team': 'category'
+    })
     return prepare_data(df)
 
-def test_weight_monotonic_recency():
-    df = make_dummy_df()
+@pytest.fixture(scope="module")
+def df():
+    """Prepared dummy games, built once and shared read-only by every test."""
+    return make_dummy_df()
+
+def test_weight_monotonic_recency(df):
     weights = calculate_sample_weights(df, current_season='2025-26')
     # Later dates should have >= earlier dates within same season due to recency multiplier
-    by_date = pd.DataFrame({'date':df['game_day'], 'w':weights}).sort_values('date')
-    assert all(np.diff(by_date['w']) >= -1e-9), 'Weights should be non-decreasing over time in current season'
+    w_sorted = weights[df['game_day'].argsort().to_numpy()]
+    assert (np.diff(w_sorted) >= -1e-9).all(), 'Weights should be non-decreasing over time in current season'
 
 def test_unknown_team_encoding():
-    df = make_dummy_df()
-    enc = LabelEncoder().fit(['A','B','C'])
-    mapping = {team: idx for idx, team in enumerate(enc.classes_)}
+    predictor = AdaptivePredictor()
+    predictor.use_smart_encoding = False
+    predictor.team_encoder = LabelEncoder().fit(['A','B','C'])
     # known
-    assert mapping['A'] >= 0
-    # simulate unknown
-    unknown_team = 'Z'
-    encoded = mapping.get(unknown_team, -1)
-    assert encoded == -1
+    assert predictor._encode_team_smart('A') >= 0
+    # unknown
+    assert predictor._encode_team_smart('Z') == -1
 
-def test_prepare_data_adds_home_win():
-    df = make_dummy_df()
+def test_prepare_data_adds_home_win(df):
     assert 'home_win' in df.columns
     assert set(df['home_win'].unique()).issubset({0,1})